@@ -1,9 +1,41 @@
+import asyncio
 import time
+import uuid
 import aiohttp
 import json
 import base58
 from solders.keypair import Keypair
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+# Optional faster JSON decoder for REST responses; the stdlib json module is used otherwise
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# HTTP connection pool settings
+HTTP_MAX_CONNECTIONS = 50
+HTTP_MAX_CONNECTIONS_PER_HOST = 20
+HTTP_KEEPALIVE_TIMEOUT = 30  # seconds an idle pooled connection is kept open
+HTTP_REQUEST_TIMEOUT = 10  # seconds
+# Browser-like headers sent with every request (set once as session defaults)
+HTTP_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Origin": "https://pacifica.fi",
+    "Referer": "https://pacifica.fi/",
+    "Connection": "keep-alive",
+    "DNT": "1",
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-site"
+}
+HTTP_METHODS = ("GET", "POST", "DELETE", "PUT")
+WS_REQUEST_TIMEOUT = 5  # seconds to wait for the response to a WebSocket trading request
 
 
 def sort_json_keys(value):
@@ -19,6 +51,64 @@ def sort_json_keys(value):
         return value
 
 
+class AsyncTokenBucket:
+    """
+    Token-bucket rate limiter shared by concurrent coroutines (used by the market
+    maker and the trading-volume script).
+
+    Up to `capacity` requests may start at once; after that requests are released at
+    `rate` per second.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class PacificaHTTPError(aiohttp.ClientResponseError):
+    """
+    Error response from the Pacifica API.
+
+    Subclasses aiohttp.ClientResponseError so existing handlers still catch it.
+    `status` is the HTTP status; `error_code` and `message` are taken from the
+    JSON error body when it has them.
+    """
+
+    def __init__(self, response: aiohttp.ClientResponse, body: str):
+        error_code = None
+        message = body or response.reason or ""
+        try:
+            payload = json_loads(body)
+        except ValueError:
+            payload = None
+        if isinstance(payload, dict):
+            error_code = payload.get("code")
+            message = payload.get("error") or payload.get("message") or message
+
+        super().__init__(
+            response.request_info,
+            response.history,
+            status=response.status,
+            message=str(message),
+            headers=response.headers,
+        )
+        self.error_code = error_code
+
+
 class ApiClient:
     """
     An asynchronous client for interacting with the Pacifica Finance API,
@@ -49,9 +139,23 @@ class ApiClient:
         self.base_url = "https://api.pacifica.fi/api/v1"
         self.ws_url = "wss://ws.pacifica.fi/ws"
         self.session = None
+        # Request id -> future for WebSocket trading requests awaiting their response
+        self._ws_pending = {}
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        # One pooled keep-alive connector per client: concurrent requests reuse open
+        # TLS connections to the API host instead of handshaking per request
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_MAX_CONNECTIONS,
+            limit_per_host=HTTP_MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=HTTP_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT)
+        )
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -155,60 +259,19 @@ class ApiClient:
             JSON response from the API
         """
         url = f"{self.base_url}{endpoint}"
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Origin": "https://pacifica.fi",
-            "Referer": "https://pacifica.fi/",
-            "Connection": "keep-alive",
-            "DNT": "1",
-            "Sec-Fetch-Dest": "empty",
-            "Sec-Fetch-Mode": "cors",
-            "Sec-Fetch-Site": "same-site"
-        }
+        method = method.upper()
+        if method not in HTTP_METHODS:
+            raise ValueError(f"Unsupported HTTP method: {method}")
 
         try:
-            if method.upper() == "GET":
-                async with self.session.get(url, params=params, headers=headers) as response:
-                    if not response.ok:
-                        error_body = await response.text()
-                        if not self.release_mode:
-                            print(f"API Error on {method} {endpoint}: Status={response.status}, Body={error_body}")
-                    response.raise_for_status()
-                    return await response.json()
-
-            elif method.upper() == "POST":
-                async with self.session.post(url, json=data, headers=headers) as response:
-                    if not response.ok:
-                        error_body = await response.text()
-                        if not self.release_mode:
-                            print(f"API Error on {method} {endpoint}: Status={response.status}, Body={error_body}")
-                    response.raise_for_status()
-                    return await response.json()
-
-            elif method.upper() == "DELETE":
-                async with self.session.delete(url, json=data, headers=headers) as response:
-                    if not response.ok:
-                        error_body = await response.text()
-                        if not self.release_mode:
-                            print(f"API Error on {method} {endpoint}: Status={response.status}, Body={error_body}")
-                    response.raise_for_status()
-                    return await response.json()
-
-            elif method.upper() == "PUT":
-                async with self.session.put(url, json=data, headers=headers) as response:
-                    if not response.ok:
-                        error_body = await response.text()
-                        if not self.release_mode:
-                            print(f"API Error on {method} {endpoint}: Status={response.status}, Body={error_body}")
-                    response.raise_for_status()
-                    return await response.json()
-
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+            # Static headers are session defaults (see __aenter__); only the request itself varies
+            async with self.session.request(method, url, params=params, json=data) as response:
+                if not response.ok:
+                    error_body = await response.text()
+                    if not self.release_mode:
+                        print(f"API Error on {method} {endpoint}: Status={response.status}, Body={error_body}")
+                    raise PacificaHTTPError(response, error_body)
+                return await response.json(loads=json_loads)
 
         except Exception as e:
             if not self.release_mode:
@@ -661,6 +724,57 @@ class ApiClient:
 
         return await self._make_request("POST", "/orders/cancel", data=request, signed=True)
 
+    async def cancel_order_ws(self, send, symbol: str, order_id: int,
+                              timeout: float = WS_REQUEST_TIMEOUT) -> dict:
+        """
+        Cancel a specific order over an already open WebSocket connection.
+        Requires authentication.
+
+        Args:
+            send: The connection's send coroutine (e.g. websocket.send)
+            symbol: Market symbol (e.g., "BTC")
+            order_id: Exchange order ID
+            timeout: Seconds to wait for the response
+
+        Returns:
+            Cancellation response
+
+        Note:
+            The connection's reader must pass response frames to handle_ws_response()
+        """
+        payload = {"symbol": symbol, "order_id": order_id}
+        request = self._create_signed_request("cancel_order", payload)
+        request_id = str(uuid.uuid4())
+
+        if not self.release_mode:
+            print(f"Cancelling order {order_id} for {symbol} via WebSocket")
+
+        future = asyncio.get_running_loop().create_future()
+        self._ws_pending[request_id] = future
+        try:
+            await send(json.dumps({"id": request_id, "params": {"cancel_order": request}}))
+            response = await asyncio.wait_for(future, timeout)
+        finally:
+            self._ws_pending.pop(request_id, None)
+
+        if response.get("code", 200) != 200 or response.get("err"):
+            raise RuntimeError(f"WebSocket cancel_order failed: {response}")
+        return response
+
+    def handle_ws_response(self, data: dict) -> bool:
+        """
+        Resolve the pending WebSocket trading request that `data` answers.
+
+        Returns:
+            True if `data` was the response to one of our requests
+        """
+        future = self._ws_pending.get(data.get("id"))
+        if future is None:
+            return False
+        if not future.done():
+            future.set_result(data)
+        return True
+
     async def cancel_all_orders(self, symbol: Optional[str] = None,
                                all_symbols: bool = False,
                                exclude_reduce_only: bool = False) -> dict:
@@ -769,6 +883,39 @@ class ApiClient:
         payload = {"actions": actions}
         return await self._make_request("POST", "/orders/batch", data=payload, signed=True)
 
+    async def batch_cancel(self, symbol: str, order_ids: List[int]) -> dict:
+        """
+        Cancel several orders in one batch request.
+        Requires authentication.
+
+        Args:
+            symbol: Market symbol (e.g., "BTC")
+            order_ids: Exchange order IDs to cancel
+
+        Returns:
+            Batch operation results
+
+        Note:
+            A single order goes through cancel_order(); the batch only pays off from two orders up
+        """
+        if not order_ids:
+            raise ValueError("Must provide at least one order_id")
+        if len(order_ids) == 1:
+            return await self.cancel_order(symbol, order_ids[0])
+
+        # Each cancel is signed on its own, but all of them share one round-trip.
+        # Every action in a batch must carry the same timestamp or the batch is rejected
+        timestamp = int(time.time() * 1_000)
+        actions = [
+            {"type": "Cancel", "data": self._create_signed_request("cancel_order", {"symbol": symbol, "order_id": order_id}, timestamp=timestamp)}
+            for order_id in order_ids
+        ]
+
+        if not self.release_mode:
+            print(f"Cancelling {len(order_ids)} orders for {symbol} in one batch")
+
+        return await self.batch_orders(actions)
+
     async def get_order_status(self, symbol: str, order_id: Optional[int] = None,
                               client_order_id: Optional[str] = None) -> dict:
         """
@@ -888,6 +1035,46 @@ class ApiClient:
 
         return await self._make_request("GET", "/positions/history", params=params, signed=False)
 
+    async def iter_trade_history_pages(self, symbol: Optional[str] = None,
+                                       start_time: Optional[int] = None,
+                                       end_time: Optional[int] = None,
+                                       limit: int = 1000,
+                                       fetch_page: Optional[Callable[..., Awaitable[dict]]] = None):
+        """
+        Page through trade history by offset, yielding one page of trades at a time.
+        Requires authentication.
+
+        Args:
+            symbol: Optional market symbol to filter by; None streams every symbol
+            start_time: Start time in milliseconds
+            end_time: End time in milliseconds
+            limit: Page size (default 1000)
+            fetch_page: Called with get_trade_history's keyword arguments to fetch one page,
+                        e.g. to add rate limiting or retries (default: get_trade_history)
+
+        Yields:
+            List of trades per page, in API order
+        """
+        fetch_page = fetch_page or self.get_trade_history
+        offset = 0
+
+        while True:
+            result = await fetch_page(
+                symbol=symbol,
+                start_time=start_time,
+                end_time=end_time,
+                limit=limit,
+                offset=offset
+            )
+            trades = result.get('trades', [])
+
+            if trades:
+                yield trades
+
+            if len(trades) < limit:
+                break
+            offset += limit
+
     # ============================================================================
     # PRIVATE ENDPOINTS - Subaccount Management
     # ============================================================================
@@ -6,9 +6,21 @@ import os
 import json
 from datetime import datetime
 import asyncio
-from numba import jit, njit
 from api_client import ApiClient
 
+try:
+    from numba import jit, njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    print("⚠️  Numba not installed, using the slower NumPy backtest path: pip install numba")
+
+    def jit(*args, **kwargs):
+        """No-op stand-in for numba.jit when Numba is not installed."""
+        return lambda func: func
+
+    njit = jit
+
 
 @jit(nopython=True)
 def _calculate_performance_numba(entry_prices, exit_prices, signals, trading_fee):
@@ -41,12 +53,14 @@ def _calculate_performance_numba(entry_prices, exit_prices, signals, trading_fee
 
 
 @njit(cache=True)
-def _supertrend_direction_numba(high, low, close, period, multiplier):
+def _atr_numba(high, low, close, period):
     n = close.shape[0]
+    # TR/ATR follow the input precision (float32 prices halve the memory traffic)
+    atr = np.zeros(n, dtype=close.dtype)
     if n <= period:
-        return np.zeros(n, dtype=np.int8), -1
+        return atr
 
-    tr = np.empty(n, dtype=np.float64)
+    tr = np.empty(n, dtype=close.dtype)
     tr[0] = high[0] - low[0]
     for i in range(1, n):
         high_low = high[i] - low[i]
@@ -54,108 +68,214 @@ def _supertrend_direction_numba(high, low, close, period, multiplier):
         low_close = abs(low[i] - close[i - 1])
         tr[i] = max(high_low, high_close, low_close)
 
-    atr = np.empty(n, dtype=np.float64)
-    for i in range(period - 1):
-        atr[i] = 0.0
+    # Division by the (per-call constant) period is strength-reduced to a multiplication
+    inv_period = 1.0 / period
 
     rolling_sum = 0.0
     for i in range(period):
         rolling_sum += tr[i]
-    atr[period - 1] = rolling_sum / period
+    atr[period - 1] = rolling_sum * inv_period
 
     factor = period - 1
     for i in range(period, n):
-        atr[i] = (atr[i - 1] * factor + tr[i]) / period
+        atr[i] = (atr[i - 1] * factor + tr[i]) * inv_period
 
-    hl2 = (high + low) * 0.5
-    upper = hl2 + multiplier * atr
-    lower = hl2 - multiplier * atr
+    return atr
+
+
+@njit(cache=True)
+def _supertrend_direction_numba(high, low, close, atr, period, multiplier):
+    n = close.shape[0]
+    if n <= period:
+        return np.zeros(n, dtype=np.int8), -1
 
-    final_upper = np.empty(n, dtype=np.float64)
-    final_lower = np.empty(n, dtype=np.float64)
     direction = np.zeros(n, dtype=np.int8)
 
+    # Only the previous final bands are ever read, so they are carried as scalars.
+    # The raw bands are computed on the fly rather than materialized as hl2/upper/lower
+    # arrays, so each candle reads only high, low, close and atr.
+    # The loop body is written as selects (min/max and conditional expressions on
+    # non-short-circuit conditions) so LLVM can emit cmov/blend instead of branches.
     start = period - 1
-    final_upper[start] = upper[start]
-    final_lower[start] = lower[start]
+    hl2 = (high[start] + low[start]) * 0.5
+    final_upper = hl2 + multiplier * atr[start]
+    final_lower = hl2 - multiplier * atr[start]
     direction[start] = 1
 
     for i in range(start + 1, n):
-        prev_upper = final_upper[i - 1]
-        prev_lower = final_lower[i - 1]
-
-        if upper[i] < prev_upper or close[i - 1] > prev_upper:
-            final_upper[i] = upper[i]
-        else:
-            final_upper[i] = prev_upper
-
-        if lower[i] > prev_lower or close[i - 1] < prev_lower:
-            final_lower[i] = lower[i]
-        else:
-            final_lower[i] = prev_lower
-
-        if close[i] > final_upper[i - 1]:
-            direction[i] = 1
-        elif close[i] < final_lower[i - 1]:
-            direction[i] = -1
-        else:
-            direction[i] = direction[i - 1]
-
-        if direction[i] == 1 and final_lower[i] < prev_lower:
-            final_lower[i] = prev_lower
-        elif direction[i] == -1 and final_upper[i] > prev_upper:
-            final_upper[i] = prev_upper
+        prev_upper = final_upper
+        prev_lower = final_lower
+        prev_close = close[i - 1]
+        close_i = close[i]
+        hl2 = (high[i] + low[i]) * 0.5
+        band = multiplier * atr[i]
+        upper_i = hl2 + band
+        lower_i = hl2 - band
+
+        reset_upper = (upper_i < prev_upper) | (prev_close > prev_upper)
+        reset_lower = (lower_i > prev_lower) | (prev_close < prev_lower)
+        final_upper = upper_i if reset_upper else prev_upper
+        final_lower = lower_i if reset_lower else prev_lower
+
+        # +1 above the previous upper band, else -1 below the previous lower band, else carry
+        signal = np.int8((close_i > prev_upper) - ((close_i < prev_lower) & (close_i <= prev_upper)))
+        current = signal if signal != 0 else direction[i - 1]
+        direction[i] = current
+
+        # Bands never loosen against the current trend
+        final_lower = max(final_lower, prev_lower) if current == 1 else final_lower
+        final_upper = min(final_upper, prev_upper) if current == -1 else final_upper
 
     return direction, start
 
 
 @njit(cache=True)
-def _run_backtest_numba(open_prices, high, low, close, period, multiplier, trading_fee):
+def _run_backtest_numba(open_prices, high, low, close, atr, period, multiplier, trading_fee):
     n = close.shape[0]
     if n <= period + 1:
         return 0, 0.0, 0.0, 0, False
 
-    direction, start = _supertrend_direction_numba(high, low, close, period, multiplier)
+    direction, start = _supertrend_direction_numba(high, low, close, atr, period, multiplier)
     if start == -1:
         return 0, 0.0, 0.0, 0, False
 
-    max_trades = n
-    entry_prices = np.empty(max_trades, dtype=np.float64)
-    exit_prices = np.empty(max_trades, dtype=np.float64)
-    signals = np.empty(max_trades, dtype=np.int8)
-
-    trade_count = 0
-    previous_signal = direction[start]
-    if previous_signal == 0:
+    initial_signal = direction[start]
+    if initial_signal == 0:
         for idx in range(start + 1, n):
             if direction[idx] != 0:
-                previous_signal = direction[idx]
+                initial_signal = direction[idx]
                 break
-        if previous_signal == 0:
+        if initial_signal == 0:
             return 0, 0.0, 0.0, 0, False
 
+    # First pass: count flips so the trade arrays are allocated at their exact size
+    # (typically a few hundred entries instead of n)
+    trade_count = 0
+    previous_signal = initial_signal
     for i in range(start + 1, n - 1):
         current_signal = direction[i]
         if current_signal == 0 or current_signal == previous_signal:
             continue
-
-        entry_prices[trade_count] = open_prices[i + 1]
-        signals[trade_count] = current_signal
-
-        if trade_count > 0:
-            exit_prices[trade_count - 1] = entry_prices[trade_count]
-
         trade_count += 1
         previous_signal = current_signal
 
     if trade_count < 2:
         return 0, 0.0, 0.0, int(direction[n - 1]), False
 
+    entry_prices = np.empty(trade_count, dtype=np.float64)
+    exit_prices = np.empty(trade_count, dtype=np.float64)
+    signals = np.empty(trade_count, dtype=np.int8)
+
+    # Second pass: record entries; each trade exits at the next trade's entry
+    trade_idx = 0
+    previous_signal = initial_signal
+    for i in range(start + 1, n - 1):
+        current_signal = direction[i]
+        if current_signal == 0 or current_signal == previous_signal:
+            continue
+
+        entry_prices[trade_idx] = open_prices[i + 1]
+        signals[trade_idx] = current_signal
+
+        if trade_idx > 0:
+            exit_prices[trade_idx - 1] = entry_prices[trade_idx]
+
+        trade_idx += 1
+        previous_signal = current_signal
+
     exit_prices[trade_count - 1] = close[n - 1]
 
-    entry_prices = entry_prices[:trade_count]
-    exit_prices = exit_prices[:trade_count]
-    signals = signals[:trade_count]
+    num_flips, sharpe_ratio, cumulative_return = _calculate_performance_numba(
+        entry_prices, exit_prices, signals, trading_fee
+    )
+
+    return num_flips, sharpe_ratio, cumulative_return, int(direction[n - 1]), True
+
+
+def _compute_tr_numpy(high, low, close):
+    """Vectorized True Range; the first candle has no previous close and uses high - low."""
+    prev_close = np.roll(close, 1)
+    tr = np.maximum(np.maximum(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    tr[0] = high[0] - low[0]
+    return tr
+
+
+def _compute_atr_numpy(tr, period):
+    """
+    Wilder ATR seeded with the SMA of the first `period` TR values, matching the Numba kernel.
+    Wilder smoothing is an EWM with alpha = 1 / period and adjust=False.
+    """
+    atr = np.zeros(tr.shape[0], dtype=np.float64)
+    if tr.shape[0] <= period:
+        return atr
+    smoothed = tr[period - 1:].copy()
+    smoothed[0] = tr[:period].mean()
+    atr[period - 1:] = pd.Series(smoothed).ewm(alpha=1.0 / period, adjust=False).mean().to_numpy()
+    return atr
+
+
+def _supertrend_direction_numpy(high, low, close, atr, period, multiplier):
+    """
+    NumPy fallback for _supertrend_direction_numba, used when Numba is not installed.
+    The raw bands are vectorized; only the band-ratcheting recurrence stays a loop.
+    """
+    n = close.shape[0]
+    if n <= period:
+        return np.zeros(n, dtype=np.int8), -1
+
+    hl2 = (high + low) * 0.5
+    upper = (hl2 + multiplier * atr).tolist()
+    lower = (hl2 - multiplier * atr).tolist()
+    closes = close.tolist()
+
+    start = period - 1
+    direction = [0] * n
+    final_upper = upper[start]
+    final_lower = lower[start]
+    direction[start] = 1
+
+    for i in range(start + 1, n):
+        prev_upper = final_upper
+        prev_lower = final_lower
+
+        if upper[i] < prev_upper or closes[i - 1] > prev_upper:
+            final_upper = upper[i]
+        if lower[i] > prev_lower or closes[i - 1] < prev_lower:
+            final_lower = lower[i]
+
+        if closes[i] > prev_upper:
+            direction[i] = 1
+        elif closes[i] < prev_lower:
+            direction[i] = -1
+        else:
+            direction[i] = direction[i - 1]
+
+        if direction[i] == 1 and final_lower < prev_lower:
+            final_lower = prev_lower
+        elif direction[i] == -1 and final_upper > prev_upper:
+            final_upper = prev_upper
+
+    return np.array(direction, dtype=np.int8), start
+
+
+def _run_backtest_numpy(open_prices, high, low, close, atr, period, multiplier, trading_fee):
+    """NumPy fallback for _run_backtest_numba with vectorized flip detection."""
+    n = close.shape[0]
+    if n <= period + 1:
+        return 0, 0.0, 0.0, 0, False
+
+    direction, start = _supertrend_direction_numpy(high, low, close, atr, period, multiplier)
+    if start == -1:
+        return 0, 0.0, 0.0, 0, False
+
+    # Direction is never 0 from `start` on, so a flip is any change versus the previous candle
+    flip_idx = np.flatnonzero(direction[start + 1:n - 1] != direction[start:n - 2]) + start + 1
+    if flip_idx.shape[0] < 2:
+        return 0, 0.0, 0.0, int(direction[n - 1]), False
+
+    entry_prices = open_prices[flip_idx + 1]
+    exit_prices = np.append(entry_prices[1:], close[n - 1])
+    signals = direction[flip_idx]
 
     num_flips, sharpe_ratio, cumulative_return = _calculate_performance_numba(
         entry_prices, exit_prices, signals, trading_fee
@@ -164,6 +284,44 @@ def _run_backtest_numba(open_prices, high, low, close, period, multiplier, tradi
     return num_flips, sharpe_ratio, cumulative_return, int(direction[n - 1]), True
 
 
+# ATR arrays memoized per period across grid searches; reset whenever the price data changes
+_atr_cache = {}
+_atr_cache_key = None
+
+
+def _compute_atr(high, low, close, period):
+    if NUMBA_AVAILABLE:
+        return _atr_numba(high, low, close, period)
+    return _compute_atr_numpy(_compute_tr_numpy(high, low, close), period)
+
+
+def get_atr(price_data, period):
+    """
+    Returns the ATR array for `period`, shared by every multiplier of the grid.
+    Results are memoized while price_data['cache_key'] (candle count, first and last
+    candle time) stays the same, so repeated grid searches skip the ATR pass.
+    """
+    global _atr_cache_key
+
+    high = price_data['high']
+    low = price_data['low']
+    close = price_data['close']
+
+    cache_key = price_data.get('cache_key')
+    if cache_key is None:
+        return _compute_atr(high, low, close, period)
+
+    if cache_key != _atr_cache_key:
+        _atr_cache.clear()
+        _atr_cache_key = cache_key
+
+    atr = _atr_cache.get(period)
+    if atr is None:
+        atr = _compute_atr(high, low, close, period)
+        _atr_cache[period] = atr
+    return atr
+
+
 def run_backtest(price_data, atr_period, atr_multiplier, trading_fee=0.0010):
     """
     Runs a simple stop-and-reverse backtest on the Supertrend strategy.
@@ -177,8 +335,10 @@ def run_backtest(price_data, atr_period, atr_multiplier, trading_fee=0.0010):
     if open_prices.shape[0] < atr_period + 2:
         return None
 
-    num_flips, sharpe_ratio, cumulative_return, last_signal, is_valid = _run_backtest_numba(
-        open_prices, high, low, close, atr_period, atr_multiplier, trading_fee
+    atr = get_atr(price_data, atr_period)
+    backtest_kernel = _run_backtest_numba if NUMBA_AVAILABLE else _run_backtest_numpy
+    num_flips, sharpe_ratio, cumulative_return, last_signal, is_valid = backtest_kernel(
+        open_prices, high, low, close, atr, atr_period, atr_multiplier, trading_fee
     )
 
     if not is_valid:
@@ -194,36 +354,46 @@ def run_backtest(price_data, atr_period, atr_multiplier, trading_fee=0.0010):
     }
 
 
+# Explicit dtypes for the price/volume columns of the kline cache, covering both the
+# generate_klines.py header and the renamed header written back by perform_grid_search.
+# Timestamp and trade-count columns are left to inference so older files with
+# float-formatted integers still load.
+KLINE_CSV_DTYPES = {
+    'open': np.float64, 'high': np.float64, 'low': np.float64, 'close': np.float64, 'volume': np.float64,
+    'Open': np.float64, 'High': np.float64, 'Low': np.float64, 'Close': np.float64, 'Volume': np.float64,
+}
+
+
 async def fetch_klines_data(symbol, interval, limit, total_candles, kline_cache_file):
     """
     Loads kline data from cache file.
     Note: Klines should be generated separately using generate_klines.py
+    Returns the cached klines as a DataFrame (empty if no cache is available).
     """
-    all_klines = []
-
     # Load cached data if exists
     if os.path.exists(kline_cache_file):
         print(f"Loading cached k-lines from {kline_cache_file}...")
-        df_cache = pd.read_csv(kline_cache_file)
-        all_klines = df_cache.values.tolist()
-        print(f"Loaded {len(all_klines)} klines from cache")
+        df_cache = pd.read_csv(kline_cache_file, dtype=KLINE_CSV_DTYPES)
+        print(f"Loaded {len(df_cache)} klines from cache")
 
-        if len(all_klines) >= total_candles:
-            print(f"✓ Sufficient klines available ({len(all_klines)}/{total_candles})")
-            return all_klines
+        if len(df_cache) >= total_candles:
+            print(f"✓ Sufficient klines available ({len(df_cache)}/{total_candles})")
+            return df_cache
         else:
-            print(f"⚠️  Only {len(all_klines)}/{total_candles} klines available. Need more historical data.")
+            print(f"⚠️  Only {len(df_cache)}/{total_candles} klines available. Need more historical data.")
             print(f"   Tip: Let data_collector run longer to collect more trades")
-            return all_klines
+            return df_cache
     else:
         print(f"⚠️  No kline cache found: {kline_cache_file}")
         print(f"   Run generate_klines.py first to create klines from collected trades")
-        return []
+        return pd.DataFrame()
 
 
-def perform_grid_search(symbol, interval):
+def perform_grid_search(symbol, interval, use_float32=False):
     """
     Performs a grid search to find the best Supertrend parameters.
+    With use_float32, high/low/close (and therefore TR/ATR) are held as float32 to halve
+    the memory traffic of the band loop; entry/exit prices and the Sharpe math stay float64.
     """
     # --- Parameter Grid ---
     # ATR Periods: From 100 to 1000, in steps of 20
@@ -240,46 +410,37 @@ def perform_grid_search(symbol, interval):
     kline_cache_file = f"PACIFICA_data/klines_{symbol}_{interval}.csv"
 
     # Fetch klines asynchronously
-    all_klines = asyncio.run(fetch_klines_data(symbol, interval, limit, total_candles, kline_cache_file))
+    df = asyncio.run(fetch_klines_data(symbol, interval, limit, total_candles, kline_cache_file))
 
-    if not all_klines:
+    if df.empty:
         print("Failed to fetch k-line data.")
         return
 
     # --- Process and Save Final Dataset ---
     # Detect format: generate_klines.py produces 7 columns, API would produce 12
-    if len(all_klines[0]) == 7:
+    if len(df.columns) == 7:
         # Format from generate_klines.py: timestamp, open, high, low, close, volume, trades_count
-        df = pd.DataFrame(all_klines, columns=['Open Time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Number of Trades'])
+        df.columns = ['Open Time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Number of Trades']
     else:
         # Original API format (12 columns)
-        df = pd.DataFrame(all_klines, columns=['Open Time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Close Time',
-                                               'Quote Asset Volume', 'Number of Trades', 'Taker Buy Base Asset Volume',
-                                               'Taker Buy Quote Asset Volume', 'Ignore'])
+        df.columns = ['Open Time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Close Time',
+                      'Quote Asset Volume', 'Number of Trades', 'Taker Buy Base Asset Volume',
+                      'Taker Buy Quote Asset Volume', 'Ignore']
     df.drop_duplicates(subset=['Open Time'], keep='last', inplace=True)
-    df = df.tail(total_candles)
+    df = df.tail(total_candles).reset_index(drop=True)
     df.to_csv(kline_cache_file, index=False)
+    print(f"Saved {len(df)} k-lines to cache.")
 
-    klines = df.values.tolist()
-    print(f"Saved {len(klines)} k-lines to cache.")
-
-    # Use the same format detection as before
-    if len(klines[0]) == 7:
-        # Format from generate_klines.py
-        df = pd.DataFrame(klines, columns=['Open Time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Number of Trades'])
-    else:
-        # Original API format (12 columns)
-        df = pd.DataFrame(klines, columns=['Open Time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Close Time',
-                                           'Quote Asset Volume', 'Number of Trades', 'Taker Buy Base Asset Volume',
-                                           'Taker Buy Quote Asset Volume', 'Ignore'])
     df['Open Time'] = pd.to_numeric(df['Open Time'])
-    df = df.astype({'Open': 'float', 'High': 'float', 'Low': 'float', 'Close': 'float', 'Volume': 'float'})
 
+    band_dtype = np.float32 if use_float32 else np.float64
     price_data = {
         'open': np.ascontiguousarray(df['Open'].to_numpy(dtype=np.float64)),
-        'high': np.ascontiguousarray(df['High'].to_numpy(dtype=np.float64)),
-        'low': np.ascontiguousarray(df['Low'].to_numpy(dtype=np.float64)),
-        'close': np.ascontiguousarray(df['Close'].to_numpy(dtype=np.float64)),
+        'high': np.ascontiguousarray(df['High'].to_numpy(dtype=band_dtype)),
+        'low': np.ascontiguousarray(df['Low'].to_numpy(dtype=band_dtype)),
+        'close': np.ascontiguousarray(df['Close'].to_numpy(dtype=band_dtype)),
+        # Identifies this dataset for the ATR memoization in get_atr
+        'cache_key': (len(df), int(df['Open Time'].iloc[0]), int(df['Open Time'].iloc[-1]), band_dtype.__name__),
     }
 
     # --- Data Continuity Check ---
@@ -298,61 +459,92 @@ def perform_grid_search(symbol, interval):
     else:
         print("Data continuity verified. No gaps found.")
 
-    print(f"Using {len(klines)} candles for backtest.")
+    print(f"Using {len(df)} candles for backtest.")
     print("Running backtest grid search...")
-    results = []
     total_tests = len(atr_periods) * len(atr_multipliers)
     test_count = 0
+    # Refresh the progress line about 100 times rather than on every backtest
+    progress_step = max(1, total_tests // 100)
+
+    # Valid results are stored as parallel arrays (structure of arrays) for vectorized ranking
+    periods = np.empty(total_tests, dtype=np.int64)
+    multipliers = np.empty(total_tests, dtype=np.float64)
+    flips = np.empty(total_tests, dtype=np.int64)
+    sharpes = np.empty(total_tests, dtype=np.float64)
+    returns = np.empty(total_tests, dtype=np.float64)
+    last_signals = np.empty(total_tests, dtype=np.int8)
+    result_count = 0
 
     for period in atr_periods:
         for multiplier in atr_multipliers:
             test_count += 1
-            progress = (test_count / total_tests) * 100
-            sys.stdout.write(f"\rProgress: {progress:.1f}% ({test_count}/{total_tests})")
-            sys.stdout.flush()
+            if test_count % progress_step == 0 or test_count == total_tests:
+                progress = (test_count / total_tests) * 100
+                sys.stdout.write(f"\rProgress: {progress:.1f}% ({test_count}/{total_tests})")
+                sys.stdout.flush()
 
             result = run_backtest(price_data, period, multiplier)
             if result:
-                results.append(result)
+                periods[result_count] = result['period']
+                multipliers[result_count] = result['multiplier']
+                flips[result_count] = result['flips']
+                sharpes[result_count] = result['sharpe']
+                returns[result_count] = result['return']
+                last_signals[result_count] = result['last_signal']
+                result_count += 1
 
     print("\n\nFinding the best result based on Sharpe Ratio...")
-    if not results:
+    if result_count == 0:
         print("No valid backtest results found.")
         return
 
-    # Sort by Sharpe Ratio to find the best individual performer and the top performers for consensus
-    sorted_results = sorted(results, key=lambda x: x['sharpe'], reverse=True)
-
-    if not sorted_results:
-        print("Could not determine a best result.")
-        return
-
-    best = sorted_results[0]
+    periods = periods[:result_count]
+    multipliers = multipliers[:result_count]
+    flips = flips[:result_count]
+    sharpes = sharpes[:result_count]
+    returns = returns[:result_count]
+    last_signals = last_signals[:result_count]
+
+    # Best individual performer (first one on ties, as with a stable descending sort)
+    best_idx = int(np.argmax(sharpes))
+    best = {
+        'period': int(periods[best_idx]),
+        'multiplier': float(multipliers[best_idx]),
+        'flips': int(flips[best_idx]),
+        'sharpe': float(sharpes[best_idx]),
+        'return': float(returns[best_idx]),
+    }
     print("\n--- Best Overall Result (based on Sharpe Ratio) ---")
     print(f"Period: {best['period']}, Multiplier: {best['multiplier']:.1f}, Flips: {best['flips']}, Sharpe: {best['sharpe']:.4f}, Return: {best['return']:.2%}")
 
     # --- Determine Consensus Trend from Top 5% ---
-    top_count = max(1, int(len(sorted_results) * 0.05))
+    top_count = max(1, int(result_count * 0.05))
     print(f"\nDetermining consensus trend from top {top_count} results (~5% of grid)...")
-    top_slice = sorted_results[:top_count]
+    # Only the membership of the top slice matters for the consensus, not its order
+    if top_count < result_count:
+        top_idx = np.argpartition(-sharpes, top_count - 1)[:top_count]
+    else:
+        top_idx = np.arange(result_count)
+    top_signals = last_signals[top_idx]
 
-    consensus_signals = [params['last_signal'] for params in top_slice if params['last_signal'] != 0]
+    ups = int(np.count_nonzero(top_signals == 1))
+    downs = int(np.count_nonzero(top_signals == -1))
 
-    if not consensus_signals:
+    if ups + downs == 0:
         print("Could not determine a consensus signal. Defaulting to +1.")
         consensus_trend = 1
     else:
-        signal_sum = sum(consensus_signals)
+        signal_sum = ups - downs
         if signal_sum >= 0:  # Default to +1 on a 50/50 split
             consensus_trend = 1
         else:
             consensus_trend = -1
-        print(f"Consensus signal sum: {signal_sum} -> Final Trend: {consensus_trend} ({consensus_signals.count(1)} UP vs {consensus_signals.count(-1)} DOWN)")
+        print(f"Consensus signal sum: {signal_sum} -> Final Trend: {consensus_trend} ({ups} UP vs {downs} DOWN)")
 
     # --- Save Best Parameters and Current Trend ---
     print("\nSaving best parameters and consensus trend to JSON file...")
 
-    last_candle_timestamp = pd.to_datetime(klines[-1][0], unit='ms').isoformat()
+    last_candle_timestamp = pd.to_datetime(df['Open Time'].iloc[-1], unit='ms').isoformat()
 
     output_data = {
         'best_parameters': {
@@ -391,6 +583,8 @@ if __name__ == "__main__":
                         help='The trading symbol to backtest (e.g., BTC, ETH, SOL). Defaults to BTC.')
     parser.add_argument('--interval', type=str, default='1m',
                         help='The k-line interval (e.g., 1m, 5m, 1h, 1d). Defaults to 1m.')
+    parser.add_argument('--float32', action='store_true',
+                        help='Run the ATR/band computations on float32 prices (faster, may change results on near-ties).')
     args = parser.parse_args()
 
-    perform_grid_search(args.symbol, args.interval)
\ No newline at end of file
+    perform_grid_search(args.symbol, args.interval, use_float32=args.float32)
\ No newline at end of file
@@ -11,15 +11,24 @@ This script:
 
 import pandas as pd
 import numpy as np
+import csv
+import itertools
 import os
 import json
 import asyncio
 import websockets
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import argparse
 
 
+KLINE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'trades_count']
+
+# Number of recent klines kept in memory by the real-time candle stream
+MAX_CACHED_KLINES = 10000
+
+
 def generate_klines_from_trades(trades_df: pd.DataFrame, interval: str) -> pd.DataFrame:
     """
     Generate OHLCV klines from trades data.
@@ -34,52 +43,170 @@ def generate_klines_from_trades(trades_df: pd.DataFrame, interval: str) -> pd.Da
     if trades_df.empty:
         return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'trades_count'])
 
-    # Convert interval to pandas frequency
+    # Convert interval to milliseconds
     interval_map = {
-        '1m': '1T', '3m': '3T', '5m': '5T', '15m': '15T', '30m': '30T',
-        '1h': '1H', '2h': '2H', '4h': '4H', '8h': '8H', '12h': '12H',
-        '1d': '1D'
+        '1m': 60000, '3m': 180000, '5m': 300000, '15m': 900000, '30m': 1800000,
+        '1h': 3600000, '2h': 7200000, '4h': 14400000, '8h': 28800000, '12h': 43200000,
+        '1d': 86400000
     }
 
     if interval not in interval_map:
         raise ValueError(f"Unsupported interval: {interval}. Supported: {list(interval_map.keys())}")
 
-    freq = interval_map[interval]
-
-    # Ensure timestamp is datetime
-    trades_df['timestamp'] = pd.to_datetime(trades_df['unix_timestamp_ms'], unit='ms')
-    trades_df = trades_df.sort_values('timestamp')
+    bin_ms = interval_map[interval]
 
-    # Set timestamp as index for resampling
-    trades_df = trades_df.set_index('timestamp')
+    # Bin trades on the integer millisecond timestamps directly (no datetime conversion)
+    trades_df = trades_df.sort_values('unix_timestamp_ms')
+    bins = (trades_df['unix_timestamp_ms'] // bin_ms) * bin_ms
 
-    # Resample to create klines
-    klines = pd.DataFrame()
-    klines['open'] = trades_df['price'].resample(freq).first()
-    klines['high'] = trades_df['price'].resample(freq).max()
-    klines['low'] = trades_df['price'].resample(freq).min()
-    klines['close'] = trades_df['price'].resample(freq).last()
-    klines['volume'] = trades_df['quantity'].resample(freq).sum()
-    klines['trades_count'] = trades_df['price'].resample(freq).count()
-
-    # Forward fill missing OHLC values (for periods with no trades)
-    klines['open'] = klines['open'].fillna(method='ffill')
-    klines['high'] = klines['high'].fillna(klines['close'])
-    klines['low'] = klines['low'].fillna(klines['close'])
-    klines['close'] = klines['close'].fillna(method='ffill')
-    klines['volume'] = klines['volume'].fillna(0)
-    klines['trades_count'] = klines['trades_count'].fillna(0)
+    klines = trades_df.groupby(bins.rename('timestamp'), sort=True).agg(
+        open=('price', 'first'),
+        high=('price', 'max'),
+        low=('price', 'min'),
+        close=('price', 'last'),
+        volume=('quantity', 'sum'),
+        trades_count=('price', 'count'),
+    )
 
+    # Only intervals that contain trades are emitted, so no OHLC/volume filling is needed
+    # (intervals without trades were previously filled and then dropped again).
     # Reset index to get timestamp as column
     klines = klines.reset_index()
-    klines['timestamp'] = klines['timestamp'].astype(np.int64) // 10**6  # Convert to milliseconds
 
-    # Drop rows where all OHLC are NaN (shouldn't happen after ffill)
+    # Drop rows where all OHLC are NaN (only possible if a whole interval has NaN prices)
     klines = klines.dropna(subset=['open', 'high', 'low', 'close'])
 
     return klines[['timestamp', 'open', 'high', 'low', 'close', 'volume', 'trades_count']]
 
 
+class KlineWindow:
+    """
+    Rolling in-memory window of klines keyed by candle start time.
+
+    Rows are 7-tuples in KLINE_COLUMNS order, kept sorted by timestamp so that
+    live candle updates are O(1) instead of re-reading and re-sorting the CSV.
+    The window only bounds memory: flush() appends to the cache file and never
+    drops rows that have been evicted from the window.
+    """
+
+    def __init__(self, maxlen: int = MAX_CACHED_KLINES):
+        self.maxlen = maxlen
+        self.rows: deque = deque(maxlen=maxlen)
+        self.index: Dict[int, int] = {}  # timestamp -> absolute position
+        self.offset = 0  # absolute position of rows[0]
+        self.persisted_ts: Optional[int] = None  # timestamp of the last row in the cache file
+        self.backfill: Dict[int, Tuple] = {}  # rows older than the file's last row, pending a rewrite
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _reindex(self):
+        self.offset = 0
+        self.index = {row[0]: i for i, row in enumerate(self.rows)}
+
+    def load_csv(self, path: str):
+        """Load an existing kline cache file (columns are matched by position)."""
+        if not os.path.exists(path):
+            return
+        df = pd.read_csv(path)
+        if df.empty:
+            return
+        df = df.iloc[:, :len(KLINE_COLUMNS)]
+        df.columns = KLINE_COLUMNS
+        df = df.drop_duplicates(subset=['timestamp'], keep='last').sort_values('timestamp')
+        self.rows = deque(df.itertuples(index=False, name=None), maxlen=self.maxlen)
+        self._reindex()
+        self.persisted_ts = self.rows[-1][0]
+
+    def upsert(self, row: Tuple) -> bool:
+        """
+        Insert or update a kline row.
+
+        Returns:
+            True if the row opened a new candle, False if it updated an existing one
+        """
+        timestamp = row[0]
+        if self.persisted_ts is not None and timestamp < self.persisted_ts:
+            self.backfill[timestamp] = row
+        position = self.index.get(timestamp)
+        if position is not None:
+            self.rows[position - self.offset] = row
+            return False
+
+        if self.rows and timestamp < self.rows[-1][0]:
+            # Out-of-order candle: rare, so rebuild the window
+            self.rows = deque(sorted([*self.rows, row])[-self.maxlen:], maxlen=self.maxlen)
+            self._reindex()
+            return True
+
+        if len(self.rows) == self.maxlen:
+            evicted = self.rows[0]
+            del self.index[evicted[0]]
+            self.offset += 1
+        self.rows.append(row)
+        self.index[timestamp] = self.offset + len(self.rows) - 1
+        return True
+
+    def flush(self, path: str):
+        """
+        Persist the window to the cache file (rows are written as-is, no DataFrame).
+
+        Only the file's last row (the possibly still-open candle) is rewritten and
+        newer rows are appended, so history older than the window is kept.
+        """
+        if not self.rows:
+            return
+        if self.backfill or self.persisted_ts is None or not os.path.exists(path):
+            self._rewrite(path)
+        else:
+            position = self.index.get(self.persisted_ts)
+            start = 0 if position is None else position - self.offset
+            new_rows = list(itertools.islice(self.rows, start, None))
+            with open(path, 'rb+') as f:
+                _truncate_last_line(f)
+            with open(path, 'a', newline='') as f:
+                csv.writer(f).writerows(new_rows)
+        self.persisted_ts = self.rows[-1][0]
+        self.backfill.clear()
+
+    def _rewrite(self, path: str):
+        """Merge the window into the existing cache file and rewrite it sorted (rare path)."""
+        merged: Dict[int, Tuple] = {}
+        if os.path.exists(path):
+            df = pd.read_csv(path)
+            if not df.empty:
+                df = df.iloc[:, :len(KLINE_COLUMNS)]
+                merged.update((row[0], row) for row in df.itertuples(index=False, name=None))
+        merged.update((row[0], row) for row in self.rows)
+        merged.update(self.backfill)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(KLINE_COLUMNS)
+            writer.writerows(merged[ts] for ts in sorted(merged))
+
+
+def _truncate_last_line(f):
+    """Truncate a binary file opened for update so that its last line is removed."""
+    end = f.seek(0, os.SEEK_END)
+    pos = end
+    skipped_terminator = False
+    while pos > 0:
+        step = min(4096, pos)
+        pos -= step
+        f.seek(pos)
+        chunk = f.read(step)
+        if not skipped_terminator:
+            chunk = chunk.rstrip(b'\r\n')
+            skipped_terminator = bool(chunk) or pos == 0
+            if not chunk:
+                continue
+        cut = chunk.rfind(b'\n')
+        if cut != -1:
+            f.truncate(pos + cut + 1)
+            return
+    f.truncate(0)
+
+
 async def subscribe_to_candles(symbol: str, interval: str, kline_cache_file: str, stop_event: asyncio.Event):
     """
     Subscribe to Pacifica WebSocket candle stream and update cache with new candles.
@@ -94,83 +221,77 @@ async def subscribe_to_candles(symbol: str, interval: str, kline_cache_file: str
 
     print(f"Connecting to Pacifica WebSocket for {symbol} {interval} candles...")
 
-    while not stop_event.is_set():
-        try:
-            async with websockets.connect(ws_url) as websocket:
-                # Subscribe to candle stream
-                subscribe_msg = {
-                    "method": "subscribe",
-                    "params": {
-                        "source": "candle",
-                        "symbol": symbol,
-                        "interval": interval
+    # Keep recent klines in memory; the CSV is only appended to when a candle closes
+    window = KlineWindow()
+    window.load_csv(kline_cache_file)
+    pending_flush = False
+
+    try:
+        while not stop_event.is_set():
+            try:
+                async with websockets.connect(ws_url) as websocket:
+                    # Subscribe to candle stream
+                    subscribe_msg = {
+                        "method": "subscribe",
+                        "params": {
+                            "source": "candle",
+                            "symbol": symbol,
+                            "interval": interval
+                        }
                     }
-                }
-
-                await websocket.send(json.dumps(subscribe_msg))
-                print(f"✓ Subscribed to {symbol} {interval} candles")
-
-                while not stop_event.is_set():
-                    try:
-                        message = await asyncio.wait_for(websocket.recv(), timeout=1.0)
-                        data = json.loads(message)
-
-                        # Check if it's a candle update
-                        if data.get('channel') == 'candle':
-                            candle_data = data.get('data', {})
-
-                            # Extract candle information
-                            timestamp = candle_data.get('t')  # Start time
-                            open_price = float(candle_data.get('o', 0))
-                            high_price = float(candle_data.get('h', 0))
-                            low_price = float(candle_data.get('l', 0))
-                            close_price = float(candle_data.get('c', 0))
-                            volume = float(candle_data.get('v', 0))
-                            trades_count = int(candle_data.get('n', 0))
-
-                            # Create new kline row
-                            new_kline = pd.DataFrame([{
-                                'timestamp': timestamp,
-                                'open': open_price,
-                                'high': high_price,
-                                'low': low_price,
-                                'close': close_price,
-                                'volume': volume,
-                                'trades_count': trades_count
-                            }])
-
-                            # Update cache file
-                            if os.path.exists(kline_cache_file):
-                                existing_klines = pd.read_csv(kline_cache_file)
-
-                                # Check if this candle already exists (update) or is new (append)
-                                if timestamp in existing_klines['timestamp'].values:
-                                    # Update existing candle
-                                    existing_klines.loc[existing_klines['timestamp'] == timestamp] = new_kline.iloc[0]
+
+                    await websocket.send(json.dumps(subscribe_msg))
+                    print(f"✓ Subscribed to {symbol} {interval} candles")
+
+                    while not stop_event.is_set():
+                        try:
+                            message = await asyncio.wait_for(websocket.recv(), timeout=1.0)
+                            data = json.loads(message)
+
+                            # Check if it's a candle update
+                            if data.get('channel') == 'candle':
+                                candle_data = data.get('data', {})
+
+                                # Extract candle information
+                                timestamp = candle_data.get('t')  # Start time
+                                open_price = float(candle_data.get('o', 0))
+                                high_price = float(candle_data.get('h', 0))
+                                low_price = float(candle_data.get('l', 0))
+                                close_price = float(candle_data.get('c', 0))
+                                volume = float(candle_data.get('v', 0))
+                                trades_count = int(candle_data.get('n', 0))
+
+                                # Update (or append) the candle in the in-memory window
+                                is_new_candle = window.upsert((
+                                    timestamp, open_price, high_price, low_price,
+                                    close_price, volume, trades_count
+                                ))
+
+                                # A new candle means the previous one is closed: persist the window
+                                if is_new_candle or not os.path.exists(kline_cache_file):
+                                    window.flush(kline_cache_file)
+                                    pending_flush = False
                                 else:
-                                    # Append new candle
-                                    existing_klines = pd.concat([existing_klines, new_kline], ignore_index=True)
-
-                                existing_klines = existing_klines.sort_values('timestamp')
-                                existing_klines.to_csv(kline_cache_file, index=False)
-                            else:
-                                # Create new cache file
-                                new_kline.to_csv(kline_cache_file, index=False)
-
-                            print(f"[{datetime.fromtimestamp(timestamp/1000)}] Candle: O={open_price:.2f} H={high_price:.2f} L={low_price:.2f} C={close_price:.2f} V={volume:.3f}")
-
-                    except asyncio.TimeoutError:
-                        continue
-                    except json.JSONDecodeError as e:
-                        print(f"JSON decode error: {e}")
-                        continue
-
-        except websockets.exceptions.WebSocketException as e:
-            print(f"WebSocket error: {e}. Reconnecting in 5 seconds...")
-            await asyncio.sleep(5)
-        except Exception as e:
-            print(f"Unexpected error: {e}. Reconnecting in 5 seconds...")
-            await asyncio.sleep(5)
+                                    pending_flush = True
+
+                                print(f"[{datetime.fromtimestamp(timestamp/1000)}] Candle: O={open_price:.2f} H={high_price:.2f} L={low_price:.2f} C={close_price:.2f} V={volume:.3f}")
+
+                        except asyncio.TimeoutError:
+                            continue
+                        except json.JSONDecodeError as e:
+                            print(f"JSON decode error: {e}")
+                            continue
+
+            except websockets.exceptions.WebSocketException as e:
+                print(f"WebSocket error: {e}. Reconnecting in 5 seconds...")
+                await asyncio.sleep(5)
+            except Exception as e:
+                print(f"Unexpected error: {e}. Reconnecting in 5 seconds...")
+                await asyncio.sleep(5)
+    finally:
+        # Persist the latest in-progress candle on shutdown
+        if pending_flush:
+            window.flush(kline_cache_file)
 
 
 async def main():
@@ -8,16 +8,37 @@ Usage:
     python get_my_trading_volume.py --symbol ETH --days 7
     python get_my_trading_volume.py --symbol BTC --days 30
     python get_my_trading_volume.py --days 7  # All symbols
+    python get_my_trading_volume.py --days 7 --no-cache  # Bypass the local history cache
 """
 
 import asyncio
 import argparse
+import functools
+import json
+import sqlite3
 import time
-from datetime import datetime, timedelta
-from api_client import ApiClient
+import zlib
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import aiohttp
+import numpy as np
+from api_client import ApiClient, AsyncTokenBucket
 import os
 from dotenv import load_dotenv
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    print("⚠️  Numba not installed, aggregating trades with NumPy: pip install numba")
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when Numba is not installed."""
+        return lambda func: func
+
 # Load environment variables
 load_dotenv()
 
@@ -25,13 +46,502 @@ load_dotenv()
 PRIVATE_KEY = os.getenv('PRIVATE_KEY')
 
 
-async def get_my_trading_volume(symbol: str = None, days: int = 7):
+# Maximum number of symbols whose trade history is fetched concurrently
+MAX_CONCURRENT_SYMBOL_FETCHES = 8
+
+# Shared request budget for trade-history calls, and retry policy when the API throttles
+HISTORY_REQUESTS_PER_SECOND = 20
+MAX_RATE_LIMIT_RETRIES = 3
+
+# UTC day index (ms timestamp // 86_400_000) -> 'YYYY-MM-DD'
+_date_cache = {}
+
+
+# On-disk cache of completed hours of trade history and of the markets list
+HISTORY_CACHE_FILE = os.path.join('PACIFICA_data', 'trade_history_cache.sqlite')
+MARKETS_CACHE_TTL = 3600  # seconds
+HOUR_MS = 3_600_000
+
+
+class TradeHistoryCache:
+    """
+    Read-through sqlite cache for trade history and markets.
+
+    Trade history is stored per (account, symbol, UTC hour) and only for hours that
+    are fully in the past, so cached hours never change; the current hour is always
+    fetched live.
+    """
+
+    def __init__(self, path: str = HISTORY_CACHE_FILE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS trades ("
+            "account TEXT, symbol TEXT, hour INTEGER, payload BLOB, "
+            "PRIMARY KEY (account, symbol, hour))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS markets (id INTEGER PRIMARY KEY, fetched_at REAL, payload BLOB)"
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def load_hours(self, account: str, symbol: str, first_hour: int, end_hour: int) -> dict:
+        """Return {hour: trades} for the cached hours in [first_hour, end_hour)."""
+        rows = self.conn.execute(
+            "SELECT hour, payload FROM trades WHERE account = ? AND symbol = ? AND hour >= ? AND hour < ?",
+            (account, symbol, first_hour, end_hour)
+        )
+        return {hour: json.loads(zlib.decompress(payload)) for hour, payload in rows}
+
+    def store_hours(self, account: str, symbol: str, trades_by_hour: dict):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO trades (account, symbol, hour, payload) VALUES (?, ?, ?, ?)",
+            [(account, symbol, hour, zlib.compress(json.dumps(trades).encode()))
+             for hour, trades in trades_by_hour.items()]
+        )
+        self.conn.commit()
+
+    def feed_prefix(self, account: str, symbol: str, first_hour: int, end_hour: int, on_hour) -> int:
+        """
+        Pass the cached trades of the contiguous run of hours starting at first_hour to
+        on_hour, one hour at a time, and return the first hour that has to be fetched live.
+        """
+        rows = self.conn.execute(
+            "SELECT hour, payload FROM trades WHERE account = ? AND symbol = ? AND hour >= ? AND hour < ? "
+            "ORDER BY hour",
+            (account, symbol, first_hour, end_hour)
+        )
+        fetch_hour = first_hour
+        for hour, payload in rows:
+            if hour != fetch_hour:
+                break
+            on_hour(json.loads(zlib.decompress(payload)))
+            fetch_hour += 1
+        return fetch_hour
+
+    def load_markets(self, max_age: float = MARKETS_CACHE_TTL) -> Optional[dict]:
+        row = self.conn.execute("SELECT fetched_at, payload FROM markets WHERE id = 0").fetchone()
+        if row is None or time.time() - row[0] > max_age:
+            return None
+        return json.loads(zlib.decompress(row[1]))
+
+    def store_markets(self, markets_response: dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO markets (id, fetched_at, payload) VALUES (0, ?, ?)",
+            (time.time(), zlib.compress(json.dumps(markets_response).encode()))
+        )
+        self.conn.commit()
+
+
+class HourlyTradeWriter:
+    """
+    Writes the completed hours [fetch_hour, end_hour) of one symbol's live trade
+    stream to the cache while it is being paged through.
+
+    Pages are timestamp-ordered, so every buffered hour except the one of the page's
+    last trade is final and is written straight away. Hours without trades are only
+    recorded by close(), which must be called once the stream is known to be complete.
+    """
+
+    def __init__(self, cache: TradeHistoryCache, account: str, symbol: str, fetch_hour: int, end_hour: int):
+        self.cache = cache
+        self.account = account
+        self.symbol = symbol
+        self.fetch_hour = fetch_hour
+        self.end_hour = end_hour
+        self.pending = defaultdict(list)
+        self.written = set()
+
+    def add_page(self, trades: list):
+        for trade in trades:
+            hour = int(trade['timestamp']) // HOUR_MS
+            if self.fetch_hour <= hour < self.end_hour:
+                self.pending[hour].append(trade)
+
+        if trades:
+            open_hour = int(trades[-1]['timestamp']) // HOUR_MS
+            self._flush([hour for hour in self.pending if hour != open_hour])
+
+    def close(self):
+        self._flush(list(self.pending))
+        missing = {hour: [] for hour in range(self.fetch_hour, self.end_hour) if hour not in self.written}
+        if missing:
+            self.cache.store_hours(self.account, self.symbol, missing)
+
+    def _flush(self, hours: list):
+        if hours:
+            self.cache.store_hours(self.account, self.symbol, {hour: self.pending.pop(hour) for hour in hours})
+            self.written.update(hours)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """True if an API error is the server throttling us (HTTP 429 or a rate-limit message)."""
+    if isinstance(error, aiohttp.ClientResponseError) and error.status == 429:
+        return True
+    return 'rate limit' in str(error).lower()
+
+
+async def request_trade_history(client: ApiClient, limiter: AsyncTokenBucket, **params) -> dict:
+    """
+    client.get_trade_history under the shared rate limiter, retried with exponential
+    backoff (0.5s, 1s, 2s, ... capped at 32s) when the server throttles.
+    """
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        await limiter.acquire()
+        try:
+            return await client.get_trade_history(**params)
+        except Exception as e:
+            if attempt == MAX_RATE_LIMIT_RETRIES or not is_rate_limited(e):
+                raise
+            backoff = min(32, 0.5 * 2 ** attempt)
+            print(f"[WARN] Rate limited on trade history, retrying in {backoff:.1f}s "
+                  f"(attempt {attempt + 1}/{MAX_RATE_LIMIT_RETRIES})")
+            await asyncio.sleep(backoff)
+
+
+def utc_date_for_day(day_idx: int) -> str:
+    """Return the 'YYYY-MM-DD' label of a UTC day index, formatting each day only once."""
+    trade_date = _date_cache.get(day_idx)
+    if trade_date is None:
+        trade_date = datetime.fromtimestamp(day_idx * 86400, tz=timezone.utc).strftime('%Y-%m-%d')
+        _date_cache[day_idx] = trade_date
+    return trade_date
+
+
+async def fetch_symbol_trades(client: ApiClient, symbol: str, start_time: int, end_time: int, on_page,
+                              limiter: AsyncTokenBucket, verbose: bool = False):
+    """
+    Stream all of your trades for one symbol within [start_time, end_time] to on_page.
+
+    Pages are fetched sequentially: only the first request carries the time window.
+    Pages are assumed to be timestamp-ordered (either direction), so the in-range
+    slice of each page is found by bisection and paging stops once it leaves the window.
+
+    Args:
+        client: Open ApiClient
+        symbol: Trading pair symbol
+        start_time: Window start in milliseconds
+        end_time: Window end in milliseconds
+        on_page: Called with the in-range trades of each page as it arrives
+        limiter: Shared rate limiter that paces the page requests
+        verbose: Print one line per fetched page
+    """
+    batch = 0
+
+    # Pagination loop - keep fetching until we get all trades
+    while True:
+        batch += 1
+
+        # Fetch trade history using Pacifica API
+        result = await request_trade_history(
+            client, limiter,
+            symbol=symbol,
+            start_time=start_time if batch == 1 else None,
+            end_time=end_time if batch == 1 else None,
+            limit=1000
+        )
+
+        trades = result.get('trades', [])
+
+        if not trades:
+            break
+
+        # Pages are timestamp-ordered, so the in-range trades are one contiguous slice
+        timestamps = [int(t['timestamp']) for t in trades]
+        descending = timestamps[0] > timestamps[-1]
+        if descending:
+            negated = [-ts for ts in timestamps]
+            lo = bisect_left(negated, -end_time)
+            hi = bisect_right(negated, -start_time)
+        else:
+            lo = bisect_left(timestamps, start_time)
+            hi = bisect_right(timestamps, end_time)
+        filtered_trades = trades[lo:hi]
+        if filtered_trades:
+            on_page(filtered_trades)
+
+        if verbose:
+            print(f"[INFO] Batch {batch}: Fetched {len(trades)} trades ({len(filtered_trades)} in time range)")
+
+        # If we got less than 1000, we're done
+        if len(trades) < 1000:
+            break
+
+        # Stop once pagination has moved past the window: every later page is out of range
+        if descending and timestamps[-1] < start_time:
+            break
+        if not descending and timestamps[-1] > end_time:
+            break
+
+
+async def fetch_symbol_trades_cached(client: ApiClient, cache: Optional[TradeHistoryCache], symbol: str,
+                                     start_time: int, end_time: int, aggregator: 'VolumeAggregator',
+                                     limiter: AsyncTokenBucket, verbose: bool = False):
+    """
+    Feed one symbol's trades within [start_time, end_time] into aggregator, reading
+    completed UTC hours from the cache.
+
+    Cached hours are used up to the first missing one; the rest of the window is
+    fetched live (from that hour's start) and its completed hours are stored.
+    """
+    def feed(trades):
+        aggregator.feed(symbol, [t for t in trades if start_time <= int(t['timestamp']) <= end_time])
+
+    if cache is None:
+        await fetch_symbol_trades(client, symbol, start_time, end_time, feed, limiter, verbose)
+        return
+
+    first_hour = start_time // HOUR_MS
+    end_hour = end_time // HOUR_MS  # Hours before this one are complete
+    fetch_hour = cache.feed_prefix(client.public_key, symbol, first_hour, end_hour, feed)
+
+    if verbose and fetch_hour > first_hour:
+        print(f"[INFO] Loaded {fetch_hour - first_hour} cached hours of history for {symbol}")
+
+    writer = HourlyTradeWriter(cache, client.public_key, symbol, fetch_hour, end_hour)
+
+    def feed_live(trades):
+        writer.add_page(trades)
+        feed(trades)
+
+    await fetch_symbol_trades(client, symbol, fetch_hour * HOUR_MS, end_time, feed_live, limiter, verbose)
+    writer.close()
+
+
+async def fetch_trades_batch_cached(client: ApiClient, cache: Optional[TradeHistoryCache], symbols: list,
+                                    start_time: int, end_time: int, aggregator: 'VolumeAggregator',
+                                    limiter: AsyncTokenBucket):
+    """
+    Feed the trades of several symbols into aggregator from one shared, unfiltered
+    trade-history stream.
+
+    Each symbol's cached prefix of completed hours is reused; the live stream starts
+    at the earliest hour any symbol is missing and is aggregated page by page.
+    """
+    first_hour = start_time // HOUR_MS
+    end_hour = end_time // HOUR_MS
+
+    def in_window(trades):
+        return [t for t in trades if start_time <= int(t['timestamp']) <= end_time]
+
+    live_from = {}
+    writers = {}
+    for sym in symbols:
+        fetch_hour = first_hour
+        if cache is not None:
+            fetch_hour = cache.feed_prefix(
+                client.public_key, sym, first_hour, end_hour,
+                lambda trades, sym=sym: aggregator.feed(sym, in_window(trades))
+            )
+            writers[sym] = HourlyTradeWriter(cache, client.public_key, sym, fetch_hour, end_hour)
+        live_from[sym] = fetch_hour * HOUR_MS
+
+    # One unfiltered (all symbols) pass, paced by the shared limiter
+    fetch_page = functools.partial(request_trade_history, client, limiter)
+    async for page in client.iter_trade_history_pages(start_time=min(live_from.values()), end_time=end_time,
+                                                      fetch_page=fetch_page):
+        page_by_symbol = defaultdict(list)
+        for trade in page:
+            if trade.get('symbol') in live_from:
+                page_by_symbol[trade['symbol']].append(trade)
+
+        for sym, trades in page_by_symbol.items():
+            # Trades before this symbol's live range were already fed from the cache
+            trades = [t for t in trades if live_from[sym] <= int(t['timestamp']) <= end_time]
+            if sym in writers:
+                writers[sym].add_page(trades)
+            aggregator.feed(sym, in_window(trades))
+
+    for writer in writers.values():
+        writer.close()
+
+
+# Per-symbol volume columns, in report order
+SYMBOL_VOLUME_FIELDS = (
+    ('base_volume', np.float64),
+    ('quote_volume', np.float64),
+    ('trade_count', np.int64),
+    ('buy_volume', np.float64),
+    ('sell_volume', np.float64),
+    ('buy_count', np.int64),
+    ('sell_count', np.int64)
+)
+
+
+def new_daily_volume() -> dict:
+    """Zeroed per-day volume entry."""
+    return {
+        'quote_volume': 0.0,
+        'trade_count': 0,
+        'buy_volume': 0.0,
+        'sell_volume': 0.0,
+        'buy_count': 0,
+        'sell_count': 0
+    }
+
+
+@njit(cache=True)
+def _aggregate_days_numba(day_of_trade, qty, price, is_buy, n_days):
+    """Single pass over one page of trades: per-day quote/buy/sell volume and trade counts."""
+    day_quote = np.zeros(n_days)
+    day_buy = np.zeros(n_days)
+    day_sell = np.zeros(n_days)
+    day_count = np.zeros(n_days, dtype=np.int64)
+    day_buy_count = np.zeros(n_days, dtype=np.int64)
+
+    for i in range(qty.shape[0]):
+        d = day_of_trade[i]
+        quote = qty[i] * price[i]
+        day_quote[d] += quote
+        day_count[d] += 1
+        if is_buy[i]:
+            day_buy[d] += quote
+            day_buy_count[d] += 1
+        else:
+            day_sell[d] += quote
+
+    return day_quote, day_buy, day_sell, day_count, day_buy_count
+
+
+def _aggregate_days_numpy(day_of_trade, qty, price, is_buy, n_days):
+    quote = qty * price
+    day_quote = np.bincount(day_of_trade, weights=quote, minlength=n_days)
+    day_buy = np.bincount(day_of_trade, weights=np.where(is_buy, quote, 0.0), minlength=n_days)
+    day_sell = np.bincount(day_of_trade, weights=np.where(is_buy, 0.0, quote), minlength=n_days)
+    day_count = np.bincount(day_of_trade, minlength=n_days)
+    day_buy_count = np.bincount(day_of_trade[is_buy], minlength=n_days)
+    return day_quote, day_buy, day_sell, day_count, day_buy_count
+
+
+def accumulate_trades(trades: list, daily_volumes: defaultdict) -> tuple:
+    """
+    Add one symbol's trades to the per-day volume table (a defaultdict of
+    new_daily_volume entries) and return their per-symbol totals.
+
+    The trades are converted to NumPy arrays once and aggregated per UTC day in one
+    compiled pass (Numba) or with bincount, instead of running Python arithmetic and
+    strftime for every trade.
+
+    Returns:
+        tuple: (base volume, quote volume, buy volume, sell volume, trade count, buy count)
+    """
+    n = len(trades)
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0, 0, 0
+
+    qty = np.fromiter((t['quantity'] for t in trades), dtype=np.float64, count=n)
+    price = np.fromiter((t['price'] for t in trades), dtype=np.float64, count=n)
+    timestamps = np.fromiter((int(t['timestamp']) for t in trades), dtype=np.int64, count=n)
+    is_buy = np.fromiter((t['side'] == 'bid' for t in trades), dtype=bool, count=n)
+
+    # Bucket trades by UTC day, relative to the first day of the page
+    trade_days = timestamps // 86_400_000
+    first_day = int(trade_days.min())
+    day_of_trade = trade_days - first_day
+    n_days = int(day_of_trade.max()) + 1
+
+    aggregate_days = _aggregate_days_numba if NUMBA_AVAILABLE else _aggregate_days_numpy
+    day_quote, day_buy, day_sell, day_count, day_buy_count = aggregate_days(day_of_trade, qty, price, is_buy, n_days)
+
+    buy_count = int(day_buy_count.sum())
+    quote_volume = float(day_quote.sum())
+    buy_volume = float(day_buy.sum())
+    sell_volume = float(day_sell.sum())
+
+    # Track by day
+    for i in np.flatnonzero(day_count).tolist():
+        daily = daily_volumes[utc_date_for_day(first_day + i)]
+        daily['quote_volume'] += float(day_quote[i])
+        daily['trade_count'] += int(day_count[i])
+        daily['buy_volume'] += float(day_buy[i])
+        daily['sell_volume'] += float(day_sell[i])
+        daily['buy_count'] += int(day_buy_count[i])
+        daily['sell_count'] += int(day_count[i] - day_buy_count[i])
+
+    return float(qty.sum()), quote_volume, buy_volume, sell_volume, n, buy_count
+
+
+class VolumeAggregator:
+    """
+    Per-symbol and per-day volume tables, updated one page of trades at a time.
+
+    The symbol set is fixed up front, so per-symbol volumes live in one NumPy column
+    per field, indexed through symbol_idx, rather than in a dict per symbol.
+    """
+
+    def __init__(self, symbols: list):
+        self.symbol_idx = {sym: i for i, sym in enumerate(symbols)}
+        self.columns = {field: np.zeros(len(symbols), dtype=dtype) for field, dtype in SYMBOL_VOLUME_FIELDS}
+        self.daily_volumes = defaultdict(new_daily_volume)  # day_key -> {quote_volume, trade_count, buy_volume, sell_volume}
+        self.total_quote_volume = 0.0
+        self.total_buy_volume = 0.0
+        self.total_sell_volume = 0.0
+        self.total_trades = 0
+
+    def feed(self, symbol: str, trades: list):
+        base_volume, quote_volume, buy_volume, sell_volume, trade_count, buy_count = accumulate_trades(
+            trades, self.daily_volumes
+        )
+        if trade_count == 0:
+            return
+
+        i = self.symbol_idx[symbol]
+        columns = self.columns
+        columns['base_volume'][i] += base_volume
+        columns['quote_volume'][i] += quote_volume
+        columns['trade_count'][i] += trade_count
+        columns['buy_volume'][i] += buy_volume
+        columns['sell_volume'][i] += sell_volume
+        columns['buy_count'][i] += buy_count
+        columns['sell_count'][i] += trade_count - buy_count
+
+        self.total_quote_volume += quote_volume
+        self.total_buy_volume += buy_volume
+        self.total_sell_volume += sell_volume
+        self.total_trades += trade_count
+
+    def trade_count(self, symbol: str) -> int:
+        return int(self.columns['trade_count'][self.symbol_idx[symbol]])
+
+    @property
+    def symbol_volumes(self) -> dict:
+        """{symbol: {field: value}} for every symbol that has trades."""
+        rows = {field: column.tolist() for field, column in self.columns.items()}
+        return {
+            sym: {field: values[i] for field, values in rows.items()}
+            for sym, i in self.symbol_idx.items() if rows['trade_count'][i]
+        }
+
+    def merge(self, other: 'VolumeAggregator'):
+        """Add the tables of another aggregator (over a subset of our symbols) into this one."""
+        rows = [self.symbol_idx[sym] for sym in other.symbol_idx]
+        for field, column in other.columns.items():
+            self.columns[field][rows] += column
+
+        for key, other_entry in other.daily_volumes.items():
+            entry = self.daily_volumes[key]
+            for field, value in other_entry.items():
+                entry[field] += value
+
+        self.total_quote_volume += other.total_quote_volume
+        self.total_buy_volume += other.total_buy_volume
+        self.total_sell_volume += other.total_sell_volume
+        self.total_trades += other.total_trades
+
+
+async def get_my_trading_volume(symbol: str = None, days: int = 7, use_cache: bool = True):
     """
     Fetch YOUR trading volume for the last N days.
 
     Args:
         symbol: Trading pair symbol (e.g., 'ETH', 'BTC'), or None for all symbols
         days: Number of days to look back (default: 7)
+        use_cache: Reuse completed hours of history and the markets list from the local cache
 
     Returns:
         dict: Your volume statistics including base volume, quote volume, and trade count
@@ -51,114 +561,31 @@ async def get_my_trading_volume(symbol: str = None, days: int = 7):
     print(f"[INFO] Days: {days}")
     print()
 
-    # Track volumes by symbol and by day
-    symbol_volumes = {}
-    daily_volumes = {}  # day_key -> {quote_volume, trade_count, buy_volume, sell_volume}
-    total_quote_volume = 0.0
-    total_trades = 0
+    # Track volumes by symbol and by day, aggregated page by page as trades arrive
+    aggregator = VolumeAggregator([symbol] if symbol else [])
+
+    cache = TradeHistoryCache() if use_cache else None
+    limiter = AsyncTokenBucket(HISTORY_REQUESTS_PER_SECOND)
 
     async with client:
         try:
             if symbol:
                 # Get trades for specific symbol with pagination
-                all_trades = []
-                batch = 0
-
-                # Pagination loop - keep fetching until we get all trades
-                while True:
-                    batch += 1
-
-                    # Fetch trade history using Pacifica API
-                    result = await client.get_trade_history(
-                        symbol=symbol,
-                        start_time=start_time if batch == 1 else None,
-                        end_time=end_time if batch == 1 else None,
-                        limit=1000
-                    )
-
-                    trades = result.get('trades', [])
-
-                    if not trades:
-                        break
-
-                    # Filter trades by time range
-                    filtered_trades = [t for t in trades if start_time <= int(t['timestamp']) <= end_time]
-                    all_trades.extend(filtered_trades)
-
-                    print(f"[INFO] Batch {batch}: Fetched {len(trades)} trades ({len(filtered_trades)} in time range)")
-
-                    # If we got less than 1000, we're done
-                    if len(trades) < 1000:
-                        break
-
-                    # Check if last trade is beyond our end time
-                    if int(trades[-1]['timestamp']) > end_time:
-                        break
-
-                    await asyncio.sleep(0.1)
-
-                print(f"[INFO] Total: {len(all_trades)} trades for {symbol}")
-                trades = all_trades
-
-                # Process trades
-                for trade in trades:
-                    qty = float(trade['quantity'])
-                    price = float(trade['price'])
-                    quote_qty = qty * price
-                    trade_time = int(trade['timestamp'])
-
-                    # Get the date for this trade
-                    trade_date = datetime.fromtimestamp(trade_time / 1000).strftime('%Y-%m-%d')
-
-                    if symbol not in symbol_volumes:
-                        symbol_volumes[symbol] = {
-                            'base_volume': 0.0,
-                            'quote_volume': 0.0,
-                            'trade_count': 0,
-                            'buy_volume': 0.0,
-                            'sell_volume': 0.0,
-                            'buy_count': 0,
-                            'sell_count': 0
-                        }
-
-                    symbol_volumes[symbol]['base_volume'] += qty
-                    symbol_volumes[symbol]['quote_volume'] += quote_qty
-                    symbol_volumes[symbol]['trade_count'] += 1
-                    total_quote_volume += quote_qty
-                    total_trades += 1
-
-                    # Track by day
-                    if trade_date not in daily_volumes:
-                        daily_volumes[trade_date] = {
-                            'quote_volume': 0.0,
-                            'trade_count': 0,
-                            'buy_volume': 0.0,
-                            'sell_volume': 0.0,
-                            'buy_count': 0,
-                            'sell_count': 0
-                        }
-
-                    daily_volumes[trade_date]['quote_volume'] += quote_qty
-                    daily_volumes[trade_date]['trade_count'] += 1
-
-                    # Track buy vs sell
-                    if trade['side'] == 'bid':
-                        symbol_volumes[symbol]['buy_volume'] += quote_qty
-                        symbol_volumes[symbol]['buy_count'] += 1
-                        daily_volumes[trade_date]['buy_volume'] += quote_qty
-                        daily_volumes[trade_date]['buy_count'] += 1
-                    else:
-                        symbol_volumes[symbol]['sell_volume'] += quote_qty
-                        symbol_volumes[symbol]['sell_count'] += 1
-                        daily_volumes[trade_date]['sell_volume'] += quote_qty
-                        daily_volumes[trade_date]['sell_count'] += 1
+                await fetch_symbol_trades_cached(
+                    client, cache, symbol, start_time, end_time, aggregator, limiter, verbose=True
+                )
+                print(f"[INFO] Total: {aggregator.total_trades} trades for {symbol}")
 
             else:
                 # Get trades for all symbols
                 # Get markets to find available symbols
                 print(f"[INFO] Fetching available markets...")
 
-                markets_response = await client.get_markets()
+                markets_response = cache.load_markets() if cache else None
+                if markets_response is None:
+                    markets_response = await client.get_markets()
+                    if cache:
+                        cache.store_markets(markets_response)
                 markets = markets_response.get('markets', [])
 
                 # Extract symbols and sort by volume
@@ -170,110 +597,67 @@ async def get_my_trading_volume(symbol: str = None, days: int = 7):
 
                 print(f"[INFO] Checking {len(top_symbols)} top symbols for your trades...")
 
-                for idx, sym in enumerate(top_symbols, 1):
+                def record(idx, sym, trade_count):
                     if idx % 10 == 0:
                         print(f"[PROGRESS] Checked {idx}/{len(top_symbols)} symbols...")
-                    try:
-                        # Pagination for each symbol
-                        all_trades_for_symbol = []
-                        batch = 0
-
-                        while True:
-                            batch += 1
-
-                            # Fetch trade history
-                            result = await client.get_trade_history(
-                                symbol=sym,
-                                start_time=start_time if batch == 1 else None,
-                                end_time=end_time if batch == 1 else None,
-                                limit=1000
-                            )
-
-                            trades = result.get('trades', [])
-
-                            if not trades:
-                                break
-
-                            # Filter by time range
-                            filtered_trades = [t for t in trades if start_time <= int(t['timestamp']) <= end_time]
-                            all_trades_for_symbol.extend(filtered_trades)
-
-                            # If we got less than 1000, we're done
-                            if len(trades) < 1000:
-                                break
-
-                            # Check if last trade is beyond our end time
-                            if int(trades[-1]['timestamp']) > end_time:
-                                break
-
-                            await asyncio.sleep(0.05)  # Shorter delay for all-symbols scan
-
-                        trades = all_trades_for_symbol
-
-                        if trades:
-                            print(f"[INFO] Found {len(trades)} trades for {sym}")
-
-                            for trade in trades:
-                                qty = float(trade['quantity'])
-                                price = float(trade['price'])
-                                quote_qty = qty * price
-                                trade_time = int(trade['timestamp'])
-
-                                # Get the date for this trade
-                                trade_date = datetime.fromtimestamp(trade_time / 1000).strftime('%Y-%m-%d')
-
-                                if sym not in symbol_volumes:
-                                    symbol_volumes[sym] = {
-                                        'base_volume': 0.0,
-                                        'quote_volume': 0.0,
-                                        'trade_count': 0,
-                                        'buy_volume': 0.0,
-                                        'sell_volume': 0.0,
-                                        'buy_count': 0,
-                                        'sell_count': 0
-                                    }
-
-                                symbol_volumes[sym]['base_volume'] += qty
-                                symbol_volumes[sym]['quote_volume'] += quote_qty
-                                symbol_volumes[sym]['trade_count'] += 1
-                                total_quote_volume += quote_qty
-                                total_trades += 1
-
-                                # Track by day
-                                if trade_date not in daily_volumes:
-                                    daily_volumes[trade_date] = {
-                                        'quote_volume': 0.0,
-                                        'trade_count': 0,
-                                        'buy_volume': 0.0,
-                                        'sell_volume': 0.0,
-                                        'buy_count': 0,
-                                        'sell_count': 0
-                                    }
-
-                                daily_volumes[trade_date]['quote_volume'] += quote_qty
-                                daily_volumes[trade_date]['trade_count'] += 1
-
-                                # Track buy vs sell
-                                if trade['side'] == 'bid':
-                                    symbol_volumes[sym]['buy_volume'] += quote_qty
-                                    symbol_volumes[sym]['buy_count'] += 1
-                                    daily_volumes[trade_date]['buy_volume'] += quote_qty
-                                    daily_volumes[trade_date]['buy_count'] += 1
-                                else:
-                                    symbol_volumes[sym]['sell_volume'] += quote_qty
-                                    symbol_volumes[sym]['sell_count'] += 1
-                                    daily_volumes[trade_date]['sell_volume'] += quote_qty
-                                    daily_volumes[trade_date]['sell_count'] += 1
-
-                    except Exception as e:
-                        # Silently skip symbols with no trades or errors
-                        continue
+
+                    if trade_count:
+                        print(f"[INFO] Found {trade_count} trades for {sym}")
+
+                # One shared paginated request covers every symbol
+                try:
+                    batch_aggregator = VolumeAggregator(top_symbols)
+                    await fetch_trades_batch_cached(
+                        client, cache, top_symbols, start_time, end_time, batch_aggregator, limiter
+                    )
+                except Exception as e:
+                    print(f"[WARN] Batch trade history failed ({e}), fetching per symbol")
+                    batch_aggregator = None
+
+                if batch_aggregator is not None:
+                    aggregator = batch_aggregator
+                    for idx, sym in enumerate(top_symbols, 1):
+                        record(idx, sym, aggregator.trade_count(sym))
+                else:
+                    # Fall back to fetching symbols concurrently (pagination stays sequential per symbol);
+                    # each symbol aggregates into its own tables, merged once it completes
+                    aggregator = VolumeAggregator(top_symbols)
+                    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SYMBOL_FETCHES)
+
+                    async def fetch_with_limit(sym):
+                        symbol_aggregator = VolumeAggregator([sym])
+                        async with semaphore:
+                            try:
+                                await fetch_symbol_trades_cached(
+                                    client, cache, sym, start_time, end_time, symbol_aggregator, limiter
+                                )
+                            except Exception as e:
+                                print(f"[WARN] Skipping {sym}: {e}")
+                                symbol_aggregator = VolumeAggregator([sym])
+                        return sym, symbol_aggregator
+
+                    tasks = [asyncio.create_task(fetch_with_limit(sym)) for sym in top_symbols]
+
+                    for idx, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                        sym, symbol_aggregator = await next_done
+                        aggregator.merge(symbol_aggregator)
+                        record(idx, sym, symbol_aggregator.total_trades)
 
         except Exception as e:
             print(f"[ERROR] Error fetching trades: {e}")
             import traceback
             traceback.print_exc()
             return None
+        finally:
+            if cache:
+                cache.close()
+
+    symbol_volumes = aggregator.symbol_volumes
+    daily_volumes = aggregator.daily_volumes
+    total_quote_volume = aggregator.total_quote_volume
+    total_buy_volume = aggregator.total_buy_volume
+    total_sell_volume = aggregator.total_sell_volume
+    total_trades = aggregator.total_trades
 
     # Calculate averages
     avg_daily_quote_volume = total_quote_volume / days if days > 0 else 0
@@ -310,8 +694,7 @@ async def get_my_trading_volume(symbol: str = None, days: int = 7):
 
     print("-" * 70)
     print(f"{'TOTAL':<12} ${total_quote_volume:>14,.2f} {total_trades:>10,} "
-          f"${sum(v['buy_volume'] for v in daily_volumes.values()):>14,.2f} "
-          f"${sum(v['sell_volume'] for v in daily_volumes.values()):>14,.2f}")
+          f"${total_buy_volume:>14,.2f} ${total_sell_volume:>14,.2f}")
     print("=" * 70)
     print()
 
@@ -361,6 +744,11 @@ async def main():
         default=7,
         help='Number of days to look back (default: 7)'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignore the local trade history cache and fetch everything from the API'
+    )
 
     args = parser.parse_args()
 
@@ -374,7 +762,7 @@ async def main():
 
     try:
         symbol = args.symbol.upper() if args.symbol else None
-        await get_my_trading_volume(symbol, args.days)
+        await get_my_trading_volume(symbol, args.days, use_cache=not args.no_cache)
     except KeyboardInterrupt:
         print("\n[INFO] Interrupted by user")
     except Exception as e:
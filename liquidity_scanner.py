@@ -4,7 +4,7 @@ Liquidity Scanner for Pacifica.fi Markets
 Analyzes market liquidity via WebSocket to identify the best markets for market making strategies.
 
 Metrics calculated:
-- Orderbook depth (bid/ask spread)
+- Orderbook depth (bid/ask spread from the top of each symbol's book)
 - Trading activity (from prices feed)
 - Orderbook imbalance
 - Price levels distribution
@@ -19,14 +19,24 @@ import sys
 import time
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, fields
 import statistics
 
+import numpy as np
 import websockets
 from dotenv import load_dotenv
 import os
 
+# Optional faster JSON encoder/decoder; the stdlib json module is used otherwise
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    json_loads = orjson.loads
+except ImportError:
+    ORJSON_AVAILABLE = False
+    json_loads = json.loads
+
 # Add pacifica_sdk to path
 sys.path.insert(0, str(Path(__file__).parent / "pacifica_sdk"))
 from common.constants import WS_URL
@@ -55,6 +65,10 @@ KNOWN_SYMBOLS = [
 @dataclass
 class MarketData:
     """Raw market data collected from WebSocket"""
+    # Explicit __slots__ (dataclass(slots=True) needs Python 3.10): no per-instance __dict__
+    __slots__ = ('symbol', 'mid_price', 'bid_price', 'ask_price', 'spread_bps', 'mark_price',
+                 'oracle_price', 'volume_24h', 'open_interest', 'funding_rate', 'timestamp')
+
     symbol: str
     mid_price: float
     bid_price: float
@@ -71,6 +85,9 @@ class MarketData:
 @dataclass
 class LiquidityScore:
     """Liquidity score for a market"""
+    __slots__ = ('symbol', 'mid_price', 'spread_bps', 'volume_24h', 'open_interest',
+                 'liquidity_score', 'mm_score', 'tier', 'timestamp')
+
     symbol: str
 
     # Raw metrics
@@ -100,12 +117,82 @@ class LiquidityScanner:
         self.scan_duration = scan_duration
         self.ws_url = WS_URL
         self.market_data: Dict[str, MarketData] = {}
+        self.top_of_book: Dict[str, Tuple[float, float]] = {}  # symbol -> (best bid, best ask)
         self.results: List[LiquidityScore] = []
 
     async def collect_market_data(self):
-        """Connect to WebSocket and collect market data"""
+        """Collect the prices feed and the orderbooks concurrently"""
         print(f"📡 Connecting to Pacifica WebSocket...")
 
+        await asyncio.gather(self._collect_prices(), self._collect_books(KNOWN_SYMBOLS))
+
+        # Books may have updated after the last prices message for a symbol
+        for symbol in self.market_data:
+            self._apply_top_of_book(symbol)
+
+        print(f"\n✓ Data collection complete! Analyzed {len(self.market_data)} markets")
+
+    def _apply_top_of_book(self, symbol: str):
+        """Overwrite a market's bid/ask/spread with the latest real top of book, if any"""
+        book = self.top_of_book.get(symbol)
+        data = self.market_data.get(symbol)
+        if not book or not data:
+            return
+
+        bid_price, ask_price = book
+        data.bid_price = bid_price
+        data.ask_price = ask_price
+        data.spread_bps = ((ask_price - bid_price) / data.mid_price) * 10000
+
+    async def _collect_books(self, symbols: List[str]):
+        """Collect the top of book of every symbol over one multiplexed WebSocket connection"""
+        try:
+            async with websockets.connect(self.ws_url) as websocket:
+                for symbol in symbols:
+                    subscribe_msg = {
+                        "method": "subscribe",
+                        "params": {
+                            "source": "book",
+                            "symbol": symbol,
+                            "agg_level": 1
+                        }
+                    }
+                    await websocket.send(json.dumps(subscribe_msg))
+
+                # Monotonic deadline: immune to wall-clock adjustments during the scan
+                deadline = time.monotonic() + self.scan_duration
+
+                while True:
+                    now = time.monotonic()
+                    if now >= deadline:
+                        break
+                    try:
+                        message = await asyncio.wait_for(websocket.recv(), timeout=min(1.0, deadline - now))
+                        data = json_loads(message)
+
+                        if data.get('channel') != 'book':
+                            continue
+
+                        # Frames of all subscribed books share the socket; route by symbol
+                        book = data.get('data', {})
+                        symbol = book.get('s')
+                        levels = book.get('l', [])
+                        if not symbol or len(levels) < 2 or not levels[0] or not levels[1]:
+                            continue
+
+                        bid_price = float(levels[0][0]['p'])
+                        ask_price = float(levels[1][0]['p'])
+                        if bid_price > 0 and ask_price >= bid_price:
+                            self.top_of_book[symbol] = (bid_price, ask_price)
+
+                    except asyncio.TimeoutError:
+                        continue
+
+        except Exception as e:
+            print(f"✗ WebSocket error (books): {e}")
+
+    async def _collect_prices(self):
+        """Connect to the prices feed and collect market statistics"""
         try:
             async with websockets.connect(self.ws_url) as websocket:
                 # Subscribe to prices feed (provides all markets)
@@ -119,16 +206,22 @@ class LiquidityScanner:
                 print(f"✓ Subscribed to prices feed")
                 print(f"⏳ Collecting data for {self.scan_duration} seconds...\n")
 
-                start_time = time.time()
+                # Monotonic deadline: immune to wall-clock adjustments during the scan
+                deadline = time.monotonic() + self.scan_duration
                 update_count = 0
 
-                while time.time() - start_time < self.scan_duration:
+                while True:
+                    now = time.monotonic()
+                    if now >= deadline:
+                        break
                     try:
-                        message = await asyncio.wait_for(websocket.recv(), timeout=1.0)
-                        data = json.loads(message)
+                        message = await asyncio.wait_for(websocket.recv(), timeout=min(1.0, deadline - now))
+                        data = json_loads(message)
 
                         if data.get('channel') == 'prices':
                             price_data = data.get('data', [])
+                            # One wall-clock read per message, shared by every market it updates
+                            received_at = time.time()
 
                             if isinstance(price_data, list):
                                 for item in price_data:
@@ -144,8 +237,8 @@ class LiquidityScanner:
 
                                         mid_price = float(mid)
 
-                                        # Extract bid/ask from mid and spread
-                                        # Estimate: assume 0.05% spread as baseline
+                                        # Fallback until the symbol's orderbook arrives:
+                                        # assume 0.05% spread as baseline
                                         bid_price = mid_price * 0.9995
                                         ask_price = mid_price * 1.0005
 
@@ -168,20 +261,18 @@ class LiquidityScanner:
                                             volume_24h=volume_24h,
                                             open_interest=open_interest,
                                             funding_rate=funding_rate,
-                                            timestamp=time.time()
+                                            timestamp=received_at
                                         )
+                                        self._apply_top_of_book(symbol)
 
                                 update_count += 1
                                 if update_count % 5 == 0:
-                                    elapsed = time.time() - start_time
-                                    remaining = self.scan_duration - elapsed
+                                    remaining = deadline - time.monotonic()
                                     print(f"  📊 Collected {len(self.market_data)} markets | {remaining:.0f}s remaining...")
 
                     except asyncio.TimeoutError:
                         continue
 
-                print(f"\n✓ Data collection complete! Analyzed {len(self.market_data)} markets")
-
         except Exception as e:
             print(f"✗ WebSocket error: {e}")
 
@@ -189,54 +280,61 @@ class LiquidityScanner:
         """Calculate liquidity and MM scores for all markets"""
         print(f"\n📊 Calculating liquidity scores...")
 
-        for symbol, data in self.market_data.items():
-            # Normalize metrics (0-100 scale)
+        if not self.market_data:
+            return
 
-            # Volume score: Higher is better (cap at $10M)
-            volume_score = min(data.volume_24h / 100000, 100)
+        markets = list(self.market_data.values())
+        volume = np.array([d.volume_24h for d in markets], dtype=np.float64)
+        open_interest = np.array([d.open_interest for d in markets], dtype=np.float64)
+        spread = np.array([d.spread_bps for d in markets], dtype=np.float64)
 
-            # Open interest score: Higher is better (cap at $50M)
-            oi_score = min(data.open_interest / 500000, 100)
+        # Normalize metrics (0-100 scale)
 
-            # Spread score: Lower is better (ideal < 10 bps)
-            spread_score = max(0, 100 - data.spread_bps * 5)
+        # Volume score: Higher is better (cap at $10M)
+        volume_score = np.minimum(volume / 100000, 100)
 
-            # Liquidity score (general market activity)
-            liquidity_score = (
-                volume_score * 0.40 +
-                oi_score * 0.40 +
-                spread_score * 0.20
-            )
+        # Open interest score: Higher is better (cap at $50M)
+        oi_score = np.minimum(open_interest / 500000, 100)
 
-            # Market Making score (optimized for MM strategy)
-            # Prefers: moderate volume, good OI, tight spread
-            mm_score = (
-                min(data.volume_24h / 50000, 100) * 0.30 +  # Moderate volume
-                min(data.open_interest / 250000, 100) * 0.40 +  # Good OI is critical
-                spread_score * 0.30  # Tight spread
-            )
+        # Spread score: Lower is better (ideal < 10 bps)
+        spread_score = np.maximum(0, 100 - spread * 5)
 
-            # Categorize by tier
-            if mm_score >= 60:
-                tier = "Tier 1"
-            elif mm_score >= 40:
-                tier = "Tier 2"
-            else:
-                tier = "Tier 3"
+        # Liquidity score (general market activity)
+        liquidity_score = (
+            volume_score * 0.40 +
+            oi_score * 0.40 +
+            spread_score * 0.20
+        )
+
+        # Market Making score (optimized for MM strategy)
+        # Prefers: moderate volume, good OI, tight spread
+        mm_score = (
+            np.minimum(volume / 50000, 100) * 0.30 +  # Moderate volume
+            np.minimum(open_interest / 250000, 100) * 0.40 +  # Good OI is critical
+            spread_score * 0.30  # Tight spread
+        )
+
+        # Categorize by tier
+        tier = np.where(mm_score >= 60, "Tier 1", np.where(mm_score >= 40, "Tier 2", "Tier 3"))
 
-            score = LiquidityScore(
+        timestamp = datetime.now().isoformat()
+
+        self.results.extend(
+            LiquidityScore(
                 symbol=symbol,
                 mid_price=data.mid_price,
                 spread_bps=data.spread_bps,
                 volume_24h=data.volume_24h,
                 open_interest=data.open_interest,
-                liquidity_score=liquidity_score,
-                mm_score=mm_score,
-                tier=tier,
-                timestamp=datetime.now().isoformat()
+                liquidity_score=liq,
+                mm_score=mm,
+                tier=t,
+                timestamp=timestamp
             )
-
-            self.results.append(score)
+            for (symbol, data), liq, mm, t in zip(
+                self.market_data.items(), liquidity_score.tolist(), mm_score.tolist(), tier.tolist()
+            )
+        )
 
         # Sort by MM score
         self.results.sort(key=lambda x: x.mm_score, reverse=True)
@@ -294,9 +392,19 @@ class LiquidityScanner:
             print("No results to save")
             return
 
-        tier1_markets = [asdict(s) for s in self.results if s.tier == "Tier 1"]
-        tier2_markets = [asdict(s) for s in self.results if s.tier == "Tier 2"]
-        tier3_markets = [asdict(s) for s in self.results if s.tier == "Tier 3"]
+        # Partition symbols by tier in a single pass
+        tier_markets = {"Tier 1": [], "Tier 2": [], "Tier 3": []}
+        for s in self.results:
+            tier_markets[s.tier].append(s.symbol)
+        tier1_markets = tier_markets["Tier 1"]
+        tier2_markets = tier_markets["Tier 2"]
+        tier3_markets = tier_markets["Tier 3"]
+
+        # Columnar export: one list per LiquidityScore field, rows sorted by MM score
+        all_markets_sorted = {
+            field.name: [getattr(s, field.name) for s in self.results]
+            for field in fields(LiquidityScore)
+        }
 
         output_data = {
             "scan_timestamp": datetime.now().isoformat(),
@@ -309,11 +417,14 @@ class LiquidityScanner:
             "tier1_markets": tier1_markets,
             "tier2_markets": tier2_markets,
             "tier3_markets": tier3_markets,
-            "all_markets_sorted": [asdict(s) for s in self.results]
+            "all_markets_sorted": all_markets_sorted
         }
 
-        with open(filename, 'w') as f:
-            json.dump(output_data, f, indent=2)
+        if ORJSON_AVAILABLE:
+            Path(filename).write_bytes(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w') as f:
+                json.dump(output_data, f, indent=2)
 
         print(f"✓ Results saved to {filename}")
 
@@ -1,14 +1,40 @@
 import os
 import asyncio
+import aiohttp
 import argparse
 import logging
 import websockets
 import json
+import math
+import random
 import signal
 import time
-from decimal import Decimal, ROUND_DOWN
 from dotenv import load_dotenv
-from api_client import ApiClient
+from api_client import ApiClient, AsyncTokenBucket, PacificaHTTPError
+
+# Optional faster JSON decoder for the WebSocket streams and the Supertrend/Avellaneda params
+# files (read as bytes); the stdlib json module is used otherwise.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so the existing handlers cover both.
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Optional uvloop event loop (not available on Windows); the default asyncio loop is used otherwise
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# Optional filesystem notifications for the Supertrend params file; polling is used otherwise
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
 
 # --- Configuration ---
 # STRATEGY
@@ -23,9 +49,15 @@ POSITION_THRESHOLD_USD = 15.0  # USD threshold to switch to sell mode in case of
 
 # TIMING (in seconds)
 ORDER_REFRESH_INTERVAL = 30     # How long to wait before cancelling an unfilled order, in seconds.
-RETRY_ON_ERROR_INTERVAL = 30    # How long to wait after a major error before retrying.
+RETRY_ON_ERROR_INTERVAL = 30    # How long to wait after a major error before retrying (doubles per consecutive error).
+RETRY_ON_ERROR_MAX_INTERVAL = 60  # Cap for the doubled error backoff.
+RETRY_JITTER_SECONDS = 0.5      # Random extra wait so retries don't line up.
+REDUCE_ONLY_RECOVERY_DELAY = 2  # Base wait after resetting state on a reduce-only 422 (doubles like the error backoff).
 PRICE_REPORT_INTERVAL = 60      # How often to report current prices and spread to terminal.
 BALANCE_REPORT_INTERVAL = 60    # How often to report account balance to terminal.
+INITIAL_SNAPSHOT_TIMEOUT = 10   # How long to wait for the WebSocket account snapshot at startup before falling back to REST.
+INITIAL_BALANCE_TIMEOUT = 20    # Total time budget for the REST balance fetch at startup, retries included.
+INITIAL_BALANCE_MAX_RETRY_DELAY = 2.0  # Cap for the doubling delay between balance fetch retries.
 
 # ORDER REUSE SETTINGS
 DEFAULT_PRICE_CHANGE_THRESHOLD = 0.001  # minimum price change to cancel and replace order
@@ -33,7 +65,21 @@ DEFAULT_PRICE_CHANGE_THRESHOLD = 0.001  # minimum price change to cancel and rep
 # SUPERTREND INTEGRATION
 USE_SUPERTREND_SIGNAL = True  # Toggle to use Supertrend signal for dynamic flip_mode
 SUPERTREND_PARAMS_TEMPLATE = "supertrend_params_{}.json"
-SUPERTREND_CHECK_INTERVAL = 600 # Seconds between checking the signal file
+SUPERTREND_CHECK_INTERVAL = 600 # Seconds between checking the signal file (changes are picked up immediately when watchdog is installed)
+SUPERTREND_SETTLE_DELAY = 0.5 # Seconds to let a signal file rewrite finish before re-reading it
+
+# WEBSOCKET
+WS_COMPRESSION = None  # Don't negotiate permessage-deflate: frames skip zlib inflate on every receive
+WS_PRICE_SPREAD_PCT = 0.0002  # Minimal spread used to estimate bid/ask from the mid price (0.02%)
+WS_BID_MULTIPLIER = 1 - WS_PRICE_SPREAD_PCT
+WS_ASK_MULTIPLIER = 1 + WS_PRICE_SPREAD_PCT
+WS_STALE_SECONDS = 60  # Reconnect when no frame has arrived for this long
+WS_STALE_CHECK_INTERVAL = 10  # How often the stale-connection watchdog checks
+SIDE_SIGN = {'bid': 1, 'ask': -1}  # Position direction -> sign of the signed position size
+
+# API RATE LIMITING
+API_RATE_LIMIT_BURST = 10  # Requests that may go out back-to-back before pacing kicks in
+API_RATE_LIMIT_PER_SEC = 10  # Sustained request rate the token bucket refills at
 
 # ORDER CANCELLATION
 CANCEL_SPECIFIC_ORDER = True # If True, cancel specific order ID. If False, cancel all orders for the symbol.
@@ -43,17 +89,21 @@ LOG_FILE = 'market_maker.log'
 RELEASE_MODE = False  # When True, suppress all non-error logs and prints (VERBOSE MODE ENABLED for debugging)
 
 # Global variables for price data and rate limiting
-price_last_updated = None
+price_last_updated = None  # time.monotonic() of the last applied price update
+PRICE_STALE_SECONDS = 30.0  # Price data older than this is treated as invalid
 last_order_time = 0
 MIN_ORDER_INTERVAL = 1.0  # Minimum seconds between order placements
 
 # Spread configuration
 PARAMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "params")
 AVELLANEDA_FILE_PREFIX = "avellaneda_parameters_"
+_LEGACY_SYMBOL_SUFFIXES = ("USDT", "USDC", "USDF", "USD1", "USD")  # Quote suffixes stripped when looking up params files
 SPREAD_MIN_THRESHOLD = 0.00005  # 0.005%
 SPREAD_MAX_THRESHOLD = 0.02     # 2%
-SPREAD_CACHE_TTL_SECONDS = 10
-_SPREAD_CACHE = {}
+SPREAD_CACHE_TTL_SECONDS = 10  # How often the background refresher reloads the spreads file
+_SPREAD_CACHE = None  # (symbol_key, buy, sell, source_path); one symbol per process
+_SPREAD_LOG = logging.getLogger('SpreadLoader')
+_PARAM_FILE_CACHE = {}  # params file path -> ((mtime_ns, size), parsed JSON payload)
 
 
 def setup_logging(file_log_level):
@@ -102,12 +152,25 @@ def setup_logging(file_log_level):
 
 class StrategyState:
     """A simple class to hold the shared state of the strategy."""
+    # Fixed attribute set: slot access is cheaper than a per-instance __dict__ on the hot paths
+    __slots__ = (
+        'bid_price', 'ask_price', 'mid_price', 'active_order_id', 'position_size',
+        'flip_mode', 'mode', 'last_order_price', 'last_order_side', 'last_order_quantity',
+        'account_balance', 'balance_last_updated', 'usdc_balance',
+        'price_changed', 'balance_changed', 'price_ready', 'balance_ready',
+        'order_updates', 'last_fill_key', 'price_ws_connected', 'user_data_ws_connected',
+        'supertrend_signal', 'ws_auth_token', 'ws_send', 'consecutive_errors',
+        'positions_ready', 'position_threshold_coins',
+    )
+
     def __init__(self, flip_mode=False):
         self.bid_price = None
         self.ask_price = None
         self.mid_price = None
         self.active_order_id = None
         self.position_size = 0.0
+        # POSITION_THRESHOLD_USD in coins at the last known mid price (0.0 until a fill computes it)
+        self.position_threshold_coins = 0.0
         # Mode can be 'bid' or 'ask'
         self.flip_mode = flip_mode
         self.mode = 'ask' if self.flip_mode else 'bid'
@@ -119,8 +182,19 @@ class StrategyState:
         self.account_balance = None  # Total USDC balance
         self.balance_last_updated = None
         self.usdc_balance = 0.0
-        # Queue for order updates from WebSocket
-        self.order_updates = asyncio.Queue()
+        # Set when fresh price/balance data lands; the reporters wait on these instead of polling
+        self.price_changed = asyncio.Event()
+        self.balance_changed = asyncio.Event()
+        # Also set on every update; the trading loop waits on these while its data is missing or stale
+        self.price_ready = asyncio.Event()
+        self.balance_ready = asyncio.Event()
+        # Set by every account_positions frame; startup waits on it instead of a REST position check
+        self.positions_ready = asyncio.Event()
+        # Latest fill event from WebSocket (only the newest one matters to the order loop)
+        self.order_updates = LatestSlot()
+        # (order_id, filled amount) of the last fill event published; the account_orders
+        # stream repeats snapshots, so the same fill would otherwise be re-sent
+        self.last_fill_key = None
         # WebSocket connection health flags
         self.price_ws_connected = False
         self.user_data_ws_connected = False
@@ -128,131 +202,394 @@ class StrategyState:
         self.supertrend_signal = None # Can be 1 (up) or -1 (down)
         # WebSocket authentication token
         self.ws_auth_token = None
+        # send() of the live multiplexer connection (None while disconnected), used for WebSocket cancels
+        self.ws_send = None
+        # Main-loop errors since the last successful order placement (drives the retry backoff)
+        self.consecutive_errors = 0
+
+
+class LatestSlot:
+    """Single-value mailbox: put() overwrites any unread value, get() waits for the newest one."""
+    def __init__(self):
+        self._value = None
+        self._ready = asyncio.Event()
+
+    def put(self, value):
+        self._value = value
+        self._ready.set()
+
+    def get_nowait(self):
+        """Take the unread value without waiting; None if nothing arrived since the last take."""
+        if not self._ready.is_set():
+            return None
+        self._ready.clear()
+        value, self._value = self._value, None
+        return value
 
+    async def get(self):
+        await self._ready.wait()
+        return self.get_nowait()
 
-async def websocket_price_updater(state, symbol):
-    """WebSocket-based price updater with exponential backoff and stale connection detection."""
+    async def wait(self):
+        """Wait until a value is put or wake() is called, without taking the value."""
+        await self._ready.wait()
+
+    def wake(self):
+        """Release waiters without a value (get_nowait() then returns None)."""
+        self._ready.set()
+
+
+def handle_prices(data, state, symbol, log, log_prices=False):
+    """Apply a decoded prices frame to the strategy state."""
     global price_last_updated
-    log = logging.getLogger('WebSocketPriceUpdater')
+
+    for price_data in data.get('data', []):
+        if price_data.get('symbol', '') == symbol:
+            # Pacifica WebSocket price format
+            mid = float(price_data.get('mid', 0))
+
+            if mid > 0:
+                # Use a minimal spread for bid/ask estimation (0.02%)
+                best_bid = mid * WS_BID_MULTIPLIER
+                best_ask = mid * WS_ASK_MULTIPLIER
+
+                state.bid_price = best_bid
+                state.ask_price = best_ask
+                state.mid_price = mid
+                price_last_updated = time.monotonic()
+                state.price_changed.set()
+                state.price_ready.set()
+
+                if log_prices:
+                    log.debug("Updated prices for %s: Bid=%.2f, Ask=%.2f, Mid=%.2f", symbol, best_bid, best_ask, mid)
+
+
+def handle_account_info(data, state, symbol, log):
+    """Update the balance from an account_info frame (balance, equity, etc.)."""
+    info_data = data.get('data', {})
+
+    # Update balance from available_to_spend (field: 'as')
+    available = float(info_data.get('as', 0))
+    if available > 0:
+        state.usdc_balance = available
+        state.account_balance = available
+        state.balance_last_updated = time.monotonic()
+        state.balance_changed.set()
+        state.balance_ready.set()
+        log.debug("Balance updated from WS: available=$%.2f", available)
+
+
+def handle_account_positions(data, state, symbol, log):
+    """Sync position size and mode from an account_positions frame."""
+    positions_list = data.get('data', [])
+
+    # Find our symbol's position ('s' is symbol); the list is rebuilt every frame, so a
+    # single early-exit scan beats indexing it into a dict or per-field columns first
+    position = next((p for p in positions_list if p.get('s') == symbol), None)
+    position_found = position is not None
+    if position_found:
+        entry_price = float(position.get('p', 0))  # 'p' is price
+
+        # Signed position from amount ('a') and direction ('d'): positive for long, negative for short
+        new_position_size = abs(float(position.get('a', 0))) * SIDE_SIGN.get(position.get('d', 'bid'), 1)
+
+        notional_value = abs(new_position_size * entry_price) if entry_price > 0 else 0
+
+        # Only update and log if there's a meaningful change
+        if abs(state.position_size - new_position_size) > 1e-9:
+            log.info(f"Position update from WS: {symbol} size {state.position_size:.6f} → {new_position_size:.6f} (notional ${notional_value:.2f})")
+            state.position_size = new_position_size
+
+        # Update mode based on notional value
+        opening_mode = 'ask' if state.flip_mode else 'bid'
+        closing_mode = 'bid' if state.flip_mode else 'ask'
+        if notional_value < POSITION_THRESHOLD_USD:
+            if state.mode != opening_mode:
+                log.info(f"Position notional ${notional_value:.2f} < threshold. Switching to {opening_mode} mode")
+                state.mode = opening_mode
+                state.position_size = 0.0
+        else:
+            if state.mode != closing_mode:
+                log.info(f"Position notional ${notional_value:.2f} >= threshold. Switching to {closing_mode} mode")
+                state.mode = closing_mode
+
+    # If position list is empty or symbol not found, we have no position
+    if not position_found and len(positions_list) == 0:
+        if abs(state.position_size) > 1e-9:
+            log.info(f"Position closed from WS: {symbol} {state.position_size:.6f} → 0")
+            state.position_size = 0.0
+            opening_mode = 'ask' if state.flip_mode else 'bid'
+            if state.mode != opening_mode:
+                state.mode = opening_mode
+
+    state.positions_ready.set()
+
+
+def handle_account_orders(data, state, symbol, log):
+    """Publish a fill event for our active order from an account_orders frame."""
+    orders_list = data.get('data', [])
+
+    # Check if our active order is in the list
+    if not state.active_order_id:
+        return
+
+    # Look up our active order by id ('i' is order_id)
+    orders_by_id = {o.get('i'): o for o in orders_list}
+    order = orders_by_id.get(state.active_order_id)
+    if order is not None:
+        filled_amount = float(order.get('f', 0))  # 'f' is filled amount
+        original_amount = float(order.get('a', 0))  # 'a' is original amount
+
+        # If order is fully filled, hand it to the order loop
+        fill_key = (order.get('i'), filled_amount)
+        if filled_amount >= original_amount and fill_key != state.last_fill_key:
+            state.last_fill_key = fill_key
+            log.info(f"Order {state.active_order_id} FILLED from WS: {filled_amount}/{original_amount}")
+            # Create a compatible format for the main loop
+            fill_event = {
+                'e': 'ORDER_FILLED',
+                'o': {
+                    'i': order.get('i'),
+                    'X': 'FILLED',
+                    'z': filled_amount,
+                    's': order.get('s'),
+                    'd': order.get('d')
+                }
+            }
+            state.order_updates.put(fill_event)
+        return
+
+    # If active order not in list, it may have been filled or cancelled
+    fill_key = (state.active_order_id, state.last_order_quantity if state.last_order_quantity else 0)
+    if fill_key != state.last_fill_key:
+        state.last_fill_key = fill_key
+        log.info(f"Active order {state.active_order_id} no longer in open orders (filled or cancelled)")
+        fill_event = {
+            'e': 'ORDER_FILLED',
+            'o': {
+                'i': state.active_order_id,
+                'X': 'FILLED',
+                'z': fill_key[1],
+                's': symbol,
+                'd': state.last_order_side if state.last_order_side else 'bid'
+            }
+        }
+        state.order_updates.put(fill_event)
+
+
+# Account channels are dispatched inline; prices go through a latest-wins slot
+ACCOUNT_HANDLERS = {
+    'account_info': handle_account_info,
+    'account_positions': handle_account_positions,
+    'account_orders': handle_account_orders,
+}
+
+
+async def consume_latest_prices(state, symbol, price_slot, log):
+    """Apply the newest decoded prices frame from price_slot to the strategy state."""
+    log_prices = log.isEnabledFor(logging.DEBUG)
+    while True:
+        data = await price_slot.get()
+        try:
+            handle_prices(data, state, symbol, log, log_prices)
+        except Exception as e:
+            log.error(f"Error processing WebSocket price message: {e}")
+
+
+async def websocket_multiplexer(state, client, symbol):
+    """Single WebSocket carrying prices and account streams, with exponential backoff and stale connection detection."""
+    log = logging.getLogger('WebSocketMultiplexer')
 
     websocket_url = "wss://ws.pacifica.fi/ws"
     reconnect_delay = 5  # Initial delay
     max_reconnect_delay = 60 # Maximum wait time
+    account_address = client.public_key
+    now = asyncio.get_running_loop().time  # bound once; called on every frame
+
+    subscriptions = [
+        {"source": "prices"},
+        {"source": "account_orders", "account": account_address},  # fill detection
+        {"source": "account_positions", "account": account_address},  # position sync
+        {"source": "account_info", "account": account_address},  # balance updates
+    ]
+    # The payloads never change for this account, so serialize them once rather than on every reconnect
+    subscribe_frames = [
+        (params["source"], json.dumps({"method": "subscribe", "params": params}))
+        for params in subscriptions
+    ]
+
+    # The Supertrend signal rides on this task's heartbeat rather than a task of its own
+    supertrend_file = None
+    supertrend_observer = None
+    last_supertrend_check = now()
+    if USE_SUPERTREND_SIGNAL:
+        supertrend_log = logging.getLogger('SupertrendUpdater')
+        # Use the symbol directly for Pacifica (e.g., BTC, ETH)
+        supertrend_file = os.path.join(PARAMS_DIR, SUPERTREND_PARAMS_TEMPLATE.format(symbol))
+
+        def refresh_supertrend():
+            nonlocal last_supertrend_check
+            last_supertrend_check = now()
+            refresh_supertrend_signal(state, supertrend_file, supertrend_log)
+
+        if WATCHDOG_AVAILABLE:
+            # A rewrite fires several events (truncate, writes); re-read once it has had time to finish
+            loop = asyncio.get_running_loop()
+            try:
+                supertrend_observer = _watch_params_file(
+                    supertrend_file, lambda: loop.call_later(SUPERTREND_SETTLE_DELAY, refresh_supertrend)
+                )
+                supertrend_log.info(f"Watching {supertrend_file} for Supertrend signal changes")
+            except Exception as e:
+                supertrend_log.warning(f"Could not watch {supertrend_file} ({e}). Checking it every {SUPERTREND_CHECK_INTERVAL}s instead.")
+
+    async def watch_for_stale_connection(websocket):
+        """
+        Heartbeat for the open connection: close the socket once no frame has arrived for
+        WS_STALE_SECONDS (so recv() raises and we reconnect), and refresh the Supertrend signal.
+        """
+        while True:
+            await asyncio.sleep(WS_STALE_CHECK_INTERVAL)
+            if supertrend_file is not None and now() - last_supertrend_check >= SUPERTREND_CHECK_INTERVAL:
+                refresh_supertrend()
+
+            time_since_last_msg = now() - last_message_time
+            if time_since_last_msg > WS_STALE_SECONDS:
+                log.warning(f"No WebSocket messages received for {time_since_last_msg:.1f}s. Connection may be stale. Reconnecting...")
+                await websocket.close()
+                return
+            log.debug("WebSocket idle for %.1fs, but connection seems alive.", time_since_last_msg)
 
-    while not shutdown_requested:
-        try:
-            log.info(f"Connecting to WebSocket: {websocket_url}")
-            state.price_ws_connected = False # Mark as disconnected while attempting
-
-            async with websockets.connect(websocket_url, ping_interval=20, ping_timeout=10) as websocket:
-                log.info(f"WebSocket connected, subscribing to prices stream")
-
-                # Subscribe to prices stream
-                subscribe_message = {
-                    "method": "subscribe",
-                    "params": {
-                        "source": "prices"
-                    }
-                }
-                await websocket.send(json.dumps(subscribe_message))
-                log.info(f"Sent subscription request for prices")
-
-                state.price_ws_connected = True # Mark as connected
-                reconnect_delay = 5  # Reset reconnect delay on successful connection
-                last_message_time = asyncio.get_event_loop().time()
+    last_message_time = now()
+    try:
+        while not shutdown_requested:
+            try:
+                log.info(f"Connecting to WebSocket: {websocket_url}")
+                state.price_ws_connected = False # Mark as disconnected while attempting
+                state.user_data_ws_connected = False
+
+                async with websockets.connect(
+                    websocket_url,
+                    ping_interval=20,
+                    ping_timeout=10,
+                    close_timeout=10,
+                    compression=WS_COMPRESSION
+                ) as websocket:
+                    log.info("WebSocket connected, subscribing to price and account streams...")
+
+                    for source, frame in subscribe_frames:
+                        await websocket.send(frame)
+                        log.info(f"Sent subscription request for {source}")
+
+                    state.price_ws_connected = True # Mark as connected
+                    state.user_data_ws_connected = True
+                    state.ws_send = websocket.send
+                    reconnect_delay = 5  # Reset reconnect delay on successful connection
+                    last_message_time = now()
+                    # Confirmations are one-shot: stop scanning frames for them once each subscription is acknowledged
+                    pending_confirmations = len(subscriptions)
+                    # Log level is fixed at startup; check it once per connection rather than per frame
+                    log_frames = log.isEnabledFor(logging.DEBUG)
+
+                    # Price frames are applied by a separate consumer that only sees the newest one,
+                    # so a burst of ticks costs one update instead of one per frame
+                    price_slot = LatestSlot()
+                    price_consumer = asyncio.create_task(consume_latest_prices(state, symbol, price_slot, log))
+                    stale_watchdog = asyncio.create_task(watch_for_stale_connection(websocket))
+
+                    # Bind what the recv loop touches on every frame to locals (LOAD_FAST instead of global/attribute lookups)
+                    recv = websocket.recv
+                    decode = json_loads
+                    put_prices = price_slot.put
+                    account_handler_for = ACCOUNT_HANDLERS.get
 
-                while not shutdown_requested:
                     try:
-                        # Wait for a message with a timeout to detect stale connections
-                        message = await asyncio.wait_for(websocket.recv(), timeout=30.0)
-                        last_message_time = asyncio.get_event_loop().time()
+                        while not shutdown_requested:
+                            # No per-recv timeout: stale connections are detected by the watchdog task
+                            message = await recv()
+                            last_message_time = now()
 
-                        try:
-                            data = json.loads(message)
                             # DEBUG: Log first 200 chars of each message to understand format
-                            log.info(f"WebSocket message: {str(data)[:200]}")
+                            if log_frames:
+                                log.debug("WebSocket message: %s", message[:200])
 
-                            # Handle subscription confirmation
-                            if 'subscribed' in str(data).lower():
-                                log.info(f"Successfully subscribed to prices stream")
+                            # Handle subscription confirmation (checked on the raw frame, not a repr of the dict)
+                            if pending_confirmations and 'subscribed' in message.lower():
+                                pending_confirmations -= 1
+                                log.info(f"Subscription confirmed: {message[:200]}")
                                 continue
 
-                            # Handle price updates (same format as data_collector)
-                            channel = data.get('channel')
-                            if channel == 'prices':
-                                prices_list = data.get('data', [])
-
-                                for price_data in prices_list:
-                                    price_symbol = price_data.get('symbol', '')
-                                    if price_symbol == symbol:
-                                        # Pacifica WebSocket price format
-                                        mid = float(price_data.get('mid', 0))
-                                        mark = float(price_data.get('mark', mid))
-
-                                        if mid > 0:
-                                            # Use a minimal spread for bid/ask estimation (0.02%)
-                                            spread_pct = 0.0002
-                                            best_bid = mid * (1 - spread_pct)
-                                            best_ask = mid * (1 + spread_pct)
-
-                                            state.bid_price = best_bid
-                                            state.ask_price = best_ask
-                                            state.mid_price = mid
-                                            price_last_updated = asyncio.get_event_loop().time()
-
-                                            log.info(f"Updated prices for {symbol}: Bid={best_bid:.2f}, Ask={best_ask:.2f}, Mid={mid:.2f}")
-
-                        except json.JSONDecodeError:
-                            log.warning("Failed to decode WebSocket message")
-                        except Exception as e:
-                            log.error(f"Error processing WebSocket message: {e}")
-
-                    # Stale connection detection logic
-                    except asyncio.TimeoutError:
-                        time_since_last_msg = asyncio.get_event_loop().time() - last_message_time
-                        if time_since_last_msg > 60:
-                            log.warning(f"No price messages received for {time_since_last_msg:.1f}s. Connection may be stale. Reconnecting...")
-                            break # Exit inner loop to force reconnection
-                        else:
-                            log.debug(f"Price WebSocket recv timed out ({time_since_last_msg:.1f}s since last message), but connection seems alive.")
-                            continue # Continue waiting for messages
-
-        except (websockets.exceptions.ConnectionClosed, websockets.exceptions.InvalidState) as e:
-            log.warning(f"Price WebSocket connection issue: {e}")
-        except Exception as e:
-            log.error(f"Price WebSocket error: {e}")
-        finally:
-            state.price_ws_connected = False # Mark as disconnected on any error/exit
-
-        if not shutdown_requested:
-            log.info(f"Reconnecting to price WebSocket in {reconnect_delay:.1f}s...")
-            await asyncio.sleep(reconnect_delay)
-            # Implement exponential backoff
-            reconnect_delay = min(reconnect_delay * 1.5, max_reconnect_delay)
+                            try:
+                                data = decode(message)
+                                channel = data.get('channel')
+
+                                if channel == 'prices':
+                                    put_prices(data)
+                                    continue
+
+                                handler = account_handler_for(channel)
+                                if handler is not None:
+                                    handler(data, state, symbol, log)
+                                elif channel is None and 'id' in data:
+                                    # Response to a trading request sent on this connection (e.g. a cancel)
+                                    client.handle_ws_response(data)
+
+                                # Handle errors
+                                if 'error' in data:
+                                    log.error(f"WebSocket error: {data.get('error')}")
+                                    if 'auth' in str(data.get('error')).lower():
+                                        log.warning("Authentication error, reconnecting...")
+                                        break
+
+                            except json.JSONDecodeError:
+                                log.warning("Failed to decode WebSocket message")
+                            except Exception as e:
+                                log.error(f"Error processing WebSocket message: {e}", exc_info=True)
+                    finally:
+                        price_consumer.cancel()
+                        stale_watchdog.cancel()
+
+            except (websockets.exceptions.ConnectionClosed, websockets.exceptions.InvalidState) as e:
+                log.warning(f"WebSocket connection issue: {e}")
+            except Exception as e:
+                log.error(f"WebSocket error: {e}", exc_info=True)
+            finally:
+                state.price_ws_connected = False # Mark as disconnected on any error/exit
+                state.user_data_ws_connected = False
+                state.ws_send = None
+
+            if not shutdown_requested:
+                log.info(f"Reconnecting to WebSocket in {reconnect_delay:.1f}s...")
+                await asyncio.sleep(reconnect_delay)
+                # Implement exponential backoff
+                reconnect_delay = min(reconnect_delay * 1.5, max_reconnect_delay)
+    finally:
+        if supertrend_observer is not None:
+            supertrend_observer.stop()
 
-    log.info("WebSocket price updater shutting down")
+    log.info("WebSocket multiplexer shutting down")
 
 def is_price_data_valid(state):
-    """Check if the price data is valid and recent."""
-    global price_last_updated
-
-    if state.mid_price is None or price_last_updated is None:
-        return False
+    """Check if the price data is valid and recent (within PRICE_STALE_SECONDS)."""
+    return (
+        state.mid_price is not None
+        and price_last_updated is not None
+        and time.monotonic() - price_last_updated <= PRICE_STALE_SECONDS
+    )
 
-    # Check if price data is recent (within 30 seconds)
-    current_time = asyncio.get_event_loop().time()
-    if current_time - price_last_updated > 30:
-        return False
 
-    return True
+async def wait_for_fresh_update(ready_event, timeout):
+    """Wait until the next update sets ready_event (updates seen before this call don't count), or timeout seconds pass."""
+    ready_event.clear()
+    try:
+        await asyncio.wait_for(ready_event.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
 
 
 def is_balance_data_valid(state):
     """Check if the balance data is valid and recent."""
-    if state.account_balance is None or state.balance_last_updated is None:
-        return False
-
-    return True
+    return state.account_balance is not None and state.balance_last_updated is not None
 
 
 async def get_ws_auth_token(client):
@@ -277,221 +614,6 @@ async def get_ws_auth_token(client):
         return None
 
 
-async def websocket_user_data_updater(state, client, symbol):
-    """WebSocket-based user data updater for account and order updates."""
-    log = logging.getLogger('UserDataUpdater')
-    reconnect_delay = 5
-    max_reconnect_delay = 60 # Maximum wait time between reconnection attempts
-    account_address = client.public_key
-
-    while not shutdown_requested:
-        try:
-            state.user_data_ws_connected = False # Mark as disconnected
-
-            ws_url = "wss://ws.pacifica.fi/ws"
-            log.info(f"Connecting to user data WebSocket: {ws_url}")
-
-            async with websockets.connect(
-                ws_url,
-                ping_interval=20,
-                ping_timeout=10,
-                close_timeout=10
-            ) as websocket:
-                log.info("User data WebSocket connected, subscribing to account streams...")
-
-                # Subscribe to account orders (for fill detection)
-                subscribe_orders_message = {
-                    "method": "subscribe",
-                    "params": {
-                        "source": "account_orders",
-                        "account": account_address
-                    }
-                }
-                await websocket.send(json.dumps(subscribe_orders_message))
-                log.info(f"Sent subscription request for account_orders ({account_address})")
-
-                # Subscribe to account positions (for position sync)
-                subscribe_positions_message = {
-                    "method": "subscribe",
-                    "params": {
-                        "source": "account_positions",
-                        "account": account_address
-                    }
-                }
-                await websocket.send(json.dumps(subscribe_positions_message))
-                log.info(f"Sent subscription request for account_positions ({account_address})")
-
-                # Subscribe to account info (for balance updates)
-                subscribe_info_message = {
-                    "method": "subscribe",
-                    "params": {
-                        "source": "account_info",
-                        "account": account_address
-                    }
-                }
-                await websocket.send(json.dumps(subscribe_info_message))
-                log.info(f"Sent subscription request for account_info ({account_address})")
-
-                state.user_data_ws_connected = True # Mark as connected
-                reconnect_delay = 5  # Reset reconnect delay on successful connection
-                last_message_time = asyncio.get_event_loop().time()
-
-                while not shutdown_requested:
-                    try:
-                        # Wait for a message with a timeout to detect stale connections
-                        message = await asyncio.wait_for(websocket.recv(), timeout=30.0)
-                        last_message_time = asyncio.get_event_loop().time()
-
-                        try:
-                            data = json.loads(message)
-                            channel = data.get('channel')
-
-                            # Handle subscription confirmation (may have 'subscribed' in message)
-                            if 'subscribed' in str(data).lower():
-                                log.info(f"Subscription confirmed: {data}")
-                                continue
-
-                            # Handle account_info updates (balance, equity, etc.)
-                            if channel == 'account_info':
-                                info_data = data.get('data', {})
-
-                                # Update balance from available_to_spend (field: 'as')
-                                available = float(info_data.get('as', 0))
-                                if available > 0:
-                                    state.usdc_balance = available
-                                    state.account_balance = available
-                                    state.balance_last_updated = asyncio.get_event_loop().time()
-                                    log.debug(f"Balance updated from WS: available=${available:.2f}")
-
-                            # Handle account_positions updates
-                            if channel == 'account_positions':
-                                positions_list = data.get('data', [])
-
-                                # Find our symbol's position
-                                position_found = False
-                                for position in positions_list:
-                                    if position.get('s') == symbol:  # 's' is symbol
-                                        position_found = True
-                                        new_position_size = float(position.get('a', 0))  # 'a' is amount
-                                        entry_price = float(position.get('p', 0))  # 'p' is price
-                                        position_side = position.get('d', 'bid')  # 'd' is direction
-
-                                        # Convert to signed position (positive for long, negative for short)
-                                        if position_side == 'ask':
-                                            new_position_size = -abs(new_position_size)  # Short is negative
-                                        else:
-                                            new_position_size = abs(new_position_size)  # Long is positive
-
-                                        notional_value = abs(new_position_size * entry_price) if entry_price > 0 else 0
-
-                                        # Only update and log if there's a meaningful change
-                                        if abs(state.position_size - new_position_size) > 1e-9:
-                                            log.info(f"Position update from WS: {symbol} size {state.position_size:.6f} → {new_position_size:.6f} (notional ${notional_value:.2f})")
-                                            state.position_size = new_position_size
-
-                                        # Update mode based on notional value
-                                        opening_mode = 'ask' if state.flip_mode else 'bid'
-                                        closing_mode = 'bid' if state.flip_mode else 'ask'
-                                        if notional_value < POSITION_THRESHOLD_USD:
-                                            if state.mode != opening_mode:
-                                                log.info(f"Position notional ${notional_value:.2f} < threshold. Switching to {opening_mode} mode")
-                                                state.mode = opening_mode
-                                                state.position_size = 0.0
-                                        else:
-                                            if state.mode != closing_mode:
-                                                log.info(f"Position notional ${notional_value:.2f} >= threshold. Switching to {closing_mode} mode")
-                                                state.mode = closing_mode
-
-                                # If position list is empty or symbol not found, we have no position
-                                if not position_found and len(positions_list) == 0:
-                                    if abs(state.position_size) > 1e-9:
-                                        log.info(f"Position closed from WS: {symbol} {state.position_size:.6f} → 0")
-                                        state.position_size = 0.0
-                                        opening_mode = 'ask' if state.flip_mode else 'bid'
-                                        if state.mode != opening_mode:
-                                            state.mode = opening_mode
-
-                            # Handle account_orders updates (for fill detection)
-                            if channel == 'account_orders':
-                                orders_list = data.get('data', [])
-
-                                # Check if our active order is in the list
-                                if state.active_order_id:
-                                    order_found = False
-                                    for order in orders_list:
-                                        if order.get('i') == state.active_order_id:  # 'i' is order_id
-                                            order_found = True
-                                            filled_amount = float(order.get('f', 0))  # 'f' is filled amount
-                                            original_amount = float(order.get('a', 0))  # 'a' is original amount
-
-                                            # If order is fully filled, queue it for processing
-                                            if filled_amount >= original_amount:
-                                                log.info(f"Order {state.active_order_id} FILLED from WS: {filled_amount}/{original_amount}")
-                                                # Create a compatible format for the main loop
-                                                fill_event = {
-                                                    'e': 'ORDER_FILLED',
-                                                    'o': {
-                                                        'i': order.get('i'),
-                                                        'X': 'FILLED',
-                                                        'z': filled_amount,
-                                                        's': order.get('s'),
-                                                        'd': order.get('d')
-                                                    }
-                                                }
-                                                await state.order_updates.put(fill_event)
-
-                                    # If active order not in list, it may have been filled or cancelled
-                                    if not order_found:
-                                        log.info(f"Active order {state.active_order_id} no longer in open orders (filled or cancelled)")
-                                        fill_event = {
-                                            'e': 'ORDER_FILLED',
-                                            'o': {
-                                                'i': state.active_order_id,
-                                                'X': 'FILLED',
-                                                'z': state.last_order_quantity if state.last_order_quantity else 0,
-                                                's': symbol,
-                                                'd': state.last_order_side if state.last_order_side else 'bid'
-                                            }
-                                        }
-                                        await state.order_updates.put(fill_event)
-
-                            # Handle errors
-                            if 'error' in data:
-                                log.error(f"WebSocket error: {data.get('error')}")
-                                if 'auth' in str(data.get('error')).lower():
-                                    log.warning("Authentication error, reconnecting...")
-                                    break
-
-                        except json.JSONDecodeError:
-                            log.warning("Failed to decode user data WebSocket message")
-                        except Exception as e:
-                            log.error(f"Error processing user data message: {e}", exc_info=True)
-
-                    except asyncio.TimeoutError:
-                        time_since_last_msg = asyncio.get_event_loop().time() - last_message_time
-                        if time_since_last_msg > 60:
-                            log.warning(f"No user data messages received for {time_since_last_msg:.1f}s. Connection may be stale. Reconnecting...")
-                            break # Exit inner loop to force reconnection
-                        else:
-                            log.debug(f"User data WebSocket recv timed out ({time_since_last_msg:.1f}s since last message), but connection seems alive.")
-                            continue # Continue waiting for messages
-
-        except (websockets.exceptions.ConnectionClosed, websockets.exceptions.InvalidState) as e:
-            log.warning(f"User data WebSocket connection issue: {e}")
-        except Exception as e:
-            log.error(f"An unexpected error occurred in user data updater: {e}", exc_info=True)
-        finally:
-            state.user_data_ws_connected = False # Mark as disconnected on any error/exit
-
-        if not shutdown_requested:
-            log.info(f"Reconnecting to user data WebSocket in {reconnect_delay:.1f}s...")
-            await asyncio.sleep(reconnect_delay)
-            # Exponential backoff
-            reconnect_delay = min(reconnect_delay * 1.5, max_reconnect_delay)
-
-    log.info("User data updater shutting down")
-
-
 async def balance_reporter(state):
     global BALANCE_REPORT_INTERVAL
     """Periodically reports current account balance (only when not in release mode)."""
@@ -504,7 +626,10 @@ async def balance_reporter(state):
 
     while not shutdown_requested:
         try:
-            await asyncio.sleep(BALANCE_REPORT_INTERVAL)  # Report every 60 seconds
+            await asyncio.sleep(BALANCE_REPORT_INTERVAL)  # Report at most every 60 seconds
+            # Only report once a balance update has arrived since the last report
+            await state.balance_changed.wait()
+            state.balance_changed.clear()
 
             if not shutdown_requested and is_balance_data_valid(state):
                 log.info(f"Account Balance: USDC={state.usdc_balance:.4f}, Total=${state.account_balance:.4f}")
@@ -516,12 +641,15 @@ async def balance_reporter(state):
 
 
 async def price_reporter(state, symbol):
-    """Periodically reports current mid-price and bid-ask spread."""
+    """Reports current mid-price and bid-ask spread at most every PRICE_REPORT_INTERVAL, when prices have changed."""
     log = logging.getLogger('PriceReporter')
 
     while not shutdown_requested:
         try:
             await asyncio.sleep(PRICE_REPORT_INTERVAL)
+            # Only report once a price update has arrived since the last report
+            await state.price_changed.wait()
+            state.price_changed.clear()
 
             if not shutdown_requested and is_price_data_valid(state):
                 bid_ask_spread = state.ask_price - state.bid_price
@@ -539,6 +667,23 @@ async def price_reporter(state, symbol):
     log.info("Price reporter shutting down")
 
 
+def _load_params_file(params_file):
+    """
+    Return the parsed JSON params file (Supertrend or Avellaneda), re-reading it
+    only when its modification time or size changed. Raises FileNotFoundError if it is missing.
+    """
+    stat = os.stat(params_file)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached_entry = _PARAM_FILE_CACHE.get(params_file)
+    if cached_entry and cached_entry[0] == signature:
+        return cached_entry[1]
+
+    with open(params_file, 'rb') as f:
+        data = json_loads(f.read())
+    _PARAM_FILE_CACHE[params_file] = (signature, data)
+    return data
+
+
 async def initialize_supertrend_signal(state, symbol):
     """Reads the Supertrend signal file once at startup to set the initial state."""
     log = logging.getLogger('SupertrendInitializer')
@@ -548,8 +693,7 @@ async def initialize_supertrend_signal(state, symbol):
 
     try:
         if os.path.exists(params_file):
-            with open(params_file, 'r') as f:
-                data = json.load(f)
+            data = _load_params_file(params_file)
 
             initial_signal = data.get('current_signal', {}).get('trend')
 
@@ -573,67 +717,134 @@ async def initialize_supertrend_signal(state, symbol):
         log.error(f"Error initializing Supertrend signal: {e}. Using default FLIP_MODE={state.flip_mode}.")
 
 
-async def supertrend_signal_updater(state, symbol):
-    """Periodically reads the Supertrend signal file and updates the strategy state."""
-    log = logging.getLogger('SupertrendUpdater')
+def _watch_params_file(params_file, on_change):
+    """
+    Start a watchdog observer that calls on_change() on the running event loop
+    whenever params_file is created, modified or moved into place. Returns the observer.
+    """
+    loop = asyncio.get_running_loop()
+    target = os.path.abspath(params_file)
 
-    # Use the symbol directly for Pacifica (e.g., BTC, ETH)
-    params_file = os.path.join(PARAMS_DIR, SUPERTREND_PARAMS_TEMPLATE.format(symbol))
+    class ParamsFileHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            paths = (event.src_path, getattr(event, 'dest_path', '') or '')
+            if any(path and os.path.abspath(path) == target for path in paths):
+                # Called on the observer thread; hand the callback to the event loop
+                loop.call_soon_threadsafe(on_change)
 
-    while not shutdown_requested:
-        try:
-            if os.path.exists(params_file):
-                with open(params_file, 'r') as f:
-                    data = json.load(f)
+    observer = Observer()
+    observer.schedule(ParamsFileHandler(), os.path.dirname(target), recursive=False)
+    observer.daemon = True
+    observer.start()
+    return observer
 
-                new_signal = data.get('current_signal', {}).get('trend')
 
-                if new_signal in [1, -1]:
-                    if state.supertrend_signal != new_signal:
-                        state.supertrend_signal = new_signal
-                        log.info(f"Supertrend signal updated to: {'UPTREND (+1)' if new_signal == 1 else 'DOWNTREND (-1)'}")
-                else:
-                    log.warning(f"Invalid signal '{new_signal}' in {params_file}. Defaulting to UPTREND (+1).")
-                    state.supertrend_signal = 1 # Default to uptrend on invalid signal
+def refresh_supertrend_signal(state, params_file, log):
+    """
+    Apply the signal from the Supertrend params file to the strategy state.
+    Cheap enough to call often: while the file is unchanged it costs one stat.
+    """
+    try:
+        try:
+            # Served from the mtime cache while the file is unchanged
+            data = _load_params_file(params_file)
+        except FileNotFoundError:
+            data = None
+
+        if data is not None:
+            new_signal = data.get('current_signal', {}).get('trend')
+
+            if new_signal in [1, -1]:
+                if state.supertrend_signal != new_signal:
+                    state.supertrend_signal = new_signal
+                    log.info(f"Supertrend signal updated to: {'UPTREND (+1)' if new_signal == 1 else 'DOWNTREND (-1)'}")
             else:
-                if state.supertrend_signal != 1: # Only log if it's a change
-                    log.warning(f"Supertrend params file not found at {params_file}. Defaulting to UPTREND (+1).")
-                    state.supertrend_signal = 1 # Default to uptrend if file not found
-
-            await asyncio.sleep(SUPERTREND_CHECK_INTERVAL)
+                log.warning(f"Invalid signal '{new_signal}' in {params_file}. Defaulting to UPTREND (+1).")
+                state.supertrend_signal = 1 # Default to uptrend on invalid signal
+        else:
+            if state.supertrend_signal != 1: # Only log if it's a change
+                log.warning(f"Supertrend params file not found at {params_file}. Defaulting to UPTREND (+1).")
+                state.supertrend_signal = 1 # Default to uptrend if file not found
 
-        except json.JSONDecodeError:
-            log.error(f"Error decoding JSON from {params_file}. Defaulting to UPTREND (+1).")
-            state.supertrend_signal = 1
-            await asyncio.sleep(SUPERTREND_CHECK_INTERVAL)
-        except Exception as e:
-            log.error(f"An error occurred in the Supertrend signal updater: {e}. Defaulting to UPTREND (+1).")
-            state.supertrend_signal = 1
-            await asyncio.sleep(SUPERTREND_CHECK_INTERVAL)
+    except json.JSONDecodeError:
+        log.error(f"Error decoding JSON from {params_file}. Defaulting to UPTREND (+1).")
+        state.supertrend_signal = 1
+    except Exception as e:
+        log.error(f"An error occurred while refreshing the Supertrend signal: {e}. Defaulting to UPTREND (+1).")
+        state.supertrend_signal = 1
 
-    log.info("Supertrend signal updater shutting down.")
 
+_POW10 = tuple(10 ** n for n in range(19))  # round_down factors by decimal precision
 
 
 def round_down(value, precision):
-    """Helper to round a value down to a given precision."""
-    factor = 10 ** precision
-    return (int(value * factor)) / factor
+    """Helper to round a value down (toward -inf, also for negative values) to a given precision."""
+    factor = _POW10[precision]
+    return math.floor(value * factor) / factor
 
 
-def should_reuse_order(state, new_price, new_side, new_quantity, threshold=DEFAULT_PRICE_CHANGE_THRESHOLD):
-    """Check if existing order can be reused based on price change threshold."""
+_CLOCK_RESOLUTION = time.get_clock_info('monotonic').resolution
+
+
+def error_backoff_delay(base_delay, consecutive_errors):
+    """Exponential backoff with jitter: base_delay doubled per consecutive error, capped at RETRY_ON_ERROR_MAX_INTERVAL."""
+    return min(RETRY_ON_ERROR_MAX_INTERVAL, base_delay * 2 ** consecutive_errors) + random.uniform(0, RETRY_JITTER_SECONDS)
+
+
+def is_transient_http_error(error):
+    """Connection errors, timeouts, 429 and 5xx responses are worth retrying; other HTTP error statuses are not."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def filled_quantity(update, order_id):
+    """
+    Filled quantity if `update` is a fill event for `order_id`, else None. Fill events are the
+    {'e': 'ORDER_FILLED', 'o': {...}} dicts handle_account_orders puts into state.order_updates.
+    """
+    if update.get('e') != 'ORDER_FILLED':
+        return None
+    order_data = update.get('o', {})
+    # Note: Pacifica doesn't support PARTIALLY_FILLED status like ASTER
+    # All fills come through as FILLED status
+    if order_data.get('i') != order_id or order_data.get('X') != 'FILLED':
+        return None
+    return float(order_data.get('z', 0.0))
+
+
+async def next_order_update(order_updates, deadline, now):
+    """
+    Return the next fill event from the order_updates slot. One that is already
+    waiting is taken without blocking (even at the deadline); otherwise wait until
+    `deadline` (on the `now` clock) and raise asyncio.TimeoutError if nothing arrives.
+    The caller schedules order_updates.wake() at the deadline so the wait ends on time.
+    """
+    while True:
+        update = order_updates.get_nowait()
+        if update is not None:
+            return update
+        # The event loop runs timers up to one clock resolution early, so allow that much slack
+        if now() + _CLOCK_RESOLUTION >= deadline:
+            raise asyncio.TimeoutError
+        await order_updates.wait()
+
+
+def should_reuse_order(state, new_price, new_side, new_quantity, tick_size, quantity_factor, threshold=DEFAULT_PRICE_CHANGE_THRESHOLD):
+    """
+    Check if existing order can be reused based on price change threshold.
+    Prices and quantities are exchange-grid values, so they are compared as whole
+    ticks / quantity steps rather than with a float tolerance.
+    """
     if (state.active_order_id is None or
         state.last_order_price is None or
         state.last_order_side != new_side or
-        abs(state.last_order_quantity - new_quantity) > 0.000000000001):  # Different quantity
+        round(state.last_order_quantity * quantity_factor) != round(new_quantity * quantity_factor)):  # Different quantity
         return False
 
-    # Calculate price change percentage
-    price_change_pct = abs(new_price - state.last_order_price) / state.last_order_price
-
-    # Reuse if price change is below threshold
-    return price_change_pct < threshold
+    # Reuse if the price moved by fewer ticks than `threshold` of the last price spans
+    price_change_ticks = abs(round(new_price / tick_size) - round(state.last_order_price / tick_size))
+    return price_change_ticks < threshold * state.last_order_price / tick_size
 
 
 def _safe_float(value):
@@ -644,25 +855,23 @@ def _safe_float(value):
 
 
 def _parameter_file_candidates(symbol):
+    """Yield params-file symbol candidates lazily; the first one usually matches."""
     symbol = (symbol or "").upper()
-    candidates = []
-
-    def add(candidate):
-        if candidate and candidate not in candidates:
-            candidates.append(candidate)
+    if not symbol:
+        return
 
-    add(symbol)
     # Pacifica uses simple symbols like BTC, ETH, SOL
-    # But also support legacy formats
-    for suffix in ("USDT", "USDC", "USDF", "USD1", "USD"):
-        if symbol.endswith(suffix) and len(symbol) > len(suffix):
-            add(symbol[:-len(suffix)])
+    yield symbol
 
-    return candidates
+    # But also support legacy formats; at most one suffix can match, so stop at the first
+    for suffix in _LEGACY_SYMBOL_SUFFIXES:
+        if symbol.endswith(suffix) and len(symbol) > len(suffix):
+            yield symbol[:-len(suffix)]
+            return
 
 
 def _extract_spread(limit_orders, key, mid_price, file_path):
-    log = logging.getLogger('SpreadLoader')
+    log = _SPREAD_LOG
     raw_percent = _safe_float(limit_orders.get(f"{key}_percent"))
     raw_delta = _safe_float(limit_orders.get(key))
     spread = None
@@ -687,15 +896,14 @@ def _extract_spread(limit_orders, key, mid_price, file_path):
 
 
 def _load_spread_overrides(symbol):
-    log = logging.getLogger('SpreadLoader')
+    log = _SPREAD_LOG
     for candidate in _parameter_file_candidates(symbol):
         file_path = os.path.join(PARAMS_DIR, f"{AVELLANEDA_FILE_PREFIX}{candidate}.json")
-        if not os.path.isfile(file_path):
-            continue
-
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                payload = json.load(file)
+            # One stat per call while the file is unchanged; re-parsed only after it is rewritten
+            payload = _load_params_file(file_path)
+        except FileNotFoundError:
+            continue
         except Exception as exc:
             log.warning(f"Failed to load {file_path}: {exc}")
             continue
@@ -717,36 +925,24 @@ def _load_spread_overrides(symbol):
     return None, None, None
 
 
-def _get_spreads_for_symbol(symbol):
-    symbol_key = (symbol or "").upper() or DEFAULT_SYMBOL
-    now = time.time()
-    cached_entry = _SPREAD_CACHE.get(symbol_key)
-    if cached_entry and cached_entry.get("expires_at", 0) > now:
-        return cached_entry["buy"], cached_entry["sell"]
+def _spread_symbol_key(symbol):
+    return (symbol or "").upper() or DEFAULT_SYMBOL
 
-    log = logging.getLogger('SpreadLoader')
+
+def _refresh_spreads(symbol_key):
+    """Reload the spreads for symbol_key from disk into _SPREAD_CACHE (blocking file I/O)."""
+    global _SPREAD_CACHE
+    log = _SPREAD_LOG
     buy_override, sell_override, source_path = _load_spread_overrides(symbol_key)
 
     buy_spread = buy_override if buy_override is not None else DEFAULT_BUY_SPREAD
     sell_spread = sell_override if sell_override is not None else DEFAULT_SELL_SPREAD
 
-    previous_signature = None
-    if cached_entry:
-        previous_signature = (
-            cached_entry.get("buy"),
-            cached_entry.get("sell"),
-            cached_entry.get("source_path")
-        )
-
-    _SPREAD_CACHE[symbol_key] = {
-        "buy": buy_spread,
-        "sell": sell_spread,
-        "expires_at": now + SPREAD_CACHE_TTL_SECONDS,
-        "source_path": source_path
-    }
+    previous_entry = _SPREAD_CACHE
+    _SPREAD_CACHE = (symbol_key, buy_spread, sell_spread, source_path)
 
-    current_signature = (buy_spread, sell_spread, source_path)
-    if current_signature != previous_signature:
+    # Only log when the spreads or their source changed since the previous load
+    if previous_entry != _SPREAD_CACHE:
         if source_path:
             source_name = os.path.basename(source_path)
             if buy_override is not None and sell_override is not None:
@@ -768,31 +964,104 @@ def _get_spreads_for_symbol(symbol):
     return buy_spread, sell_spread
 
 
-def get_spreads(state):
+def _get_spreads_for_symbol(symbol_key):
+    """Spreads for an already-normalized symbol key (see _spread_symbol_key)."""
+    cached_entry = _SPREAD_CACHE
+    if cached_entry is not None and cached_entry[0] == symbol_key:
+        return cached_entry[1], cached_entry[2]
+
+    # Not loaded yet (first cycle, before the refresher's first pass): load once inline
+    return _refresh_spreads(symbol_key)
+
+
+async def spread_refresher(symbol):
+    """Reloads the Avellaneda spreads in a worker thread so the trading loop never waits on disk."""
+    log = _SPREAD_LOG
+    loop = asyncio.get_running_loop()
+    symbol_key = _spread_symbol_key(symbol)
+
+    while not shutdown_requested:
+        try:
+            await loop.run_in_executor(None, _refresh_spreads, symbol_key)
+        except Exception as e:
+            log.error(f"Error refreshing spreads for {symbol_key}: {e}")
+        await asyncio.sleep(SPREAD_CACHE_TTL_SECONDS)
+
+    log.info("Spread refresher shutting down")
+
+
+def get_spreads(state, symbol_key):
     global DEFAULT_BUY_SPREAD, DEFAULT_SELL_SPREAD
     """
     Abstracted function to determine bid and ask spreads.
     This can be modified to implement dynamic spread calculations.
 
     :param state: The current strategy state.
+    :param symbol_key: The traded symbol, normalized once with _spread_symbol_key.
     :return: A tuple of (buy_spread, sell_spread).
     """
     if not USE_AVELLANEDA_SPREADS:
         return DEFAULT_BUY_SPREAD, DEFAULT_SELL_SPREAD
 
-    symbol = getattr(global_args, "symbol", DEFAULT_SYMBOL)
-    return _get_spreads_for_symbol(symbol)
+    return _get_spreads_for_symbol(symbol_key)
 
 
-async def market_making_loop(state, client, args):
+async def market_making_loop(state, client, args, rate_limiter):
     """The main market making logic loop."""
     log = logging.getLogger('MarketMakerLoop')
     log.info(f"Fetching trading rules for {args.symbol}...")
     symbol_filters = await client.get_symbol_filters(args.symbol)
     log.info(f"Filters loaded: {symbol_filters}")
 
+    spread_symbol_key = _spread_symbol_key(args.symbol)
+
+    # Bound once for the monitor loops; the order_updates slot lives as long as the state
+    loop = asyncio.get_running_loop()
+    now = loop.time
+    order_updates = state.order_updates
+
+    # The filters are fixed for the session; resolve them once instead of on every order cycle
+    tick_size = symbol_filters['tick_size']
+    quantity_factor = _POW10[symbol_filters['quantity_precision']]
+    dust_quantity = 1 / quantity_factor  # A position smaller than one quantity step can't be traded
+    min_notional = symbol_filters['min_notional']
+    price_format = f"{{:.{symbol_filters['price_precision']}f}}".format
+    quantity_format = f"{{:.{symbol_filters['quantity_precision']}f}}".format
+
     opening_mode = 'ask' if state.flip_mode else 'bid'
     closing_mode = 'bid' if state.flip_mode else 'ask'
+    # A fill moves the position by the filled side's sign; the sides are fixed for this loop
+    opening_sign = SIDE_SIGN[opening_mode]
+    closing_sign = SIDE_SIGN[closing_mode]
+
+    def apply_fill(filled_qty):
+        """Book a fill of our active order into the position and flip mode as needed."""
+        previous_mode = state.mode
+
+        if state.mode == opening_mode:  # An opening order was filled
+            state.position_size += opening_sign * filled_qty
+            log.info(f"{opening_mode} fill processed: new position size {state.position_size:.6f}")
+            state.mode = closing_mode  # Flip to closing mode
+            log.info(f"Mode change: {previous_mode} -> {state.mode}")
+        else:  # A closing order was filled
+            state.position_size += closing_sign * filled_qty
+            log.info(f"{closing_mode} fill processed: new position size {state.position_size:.6f}")
+
+            # Check if position is mostly closed. Without a mid price, keep the last good threshold
+            # (or one quantity step) instead of 0, which no position can be below
+            if state.mid_price:
+                state.position_threshold_coins = POSITION_THRESHOLD_USD / state.mid_price
+            position_threshold_coins = state.position_threshold_coins or dust_quantity
+            if abs(state.position_size) < position_threshold_coins:
+                state.mode = opening_mode  # Flip back to opening mode
+                log.info(f"Position below threshold ({position_threshold_coins:.6f}), mode change: {previous_mode} -> {state.mode}")
+            else:
+                log.info(f"Position still above threshold, keeping {closing_mode} mode.")
+
+        # Clear order tracking after fill
+        state.last_order_price = None
+        state.last_order_side = None
+        state.last_order_quantity = None
 
     while not shutdown_requested:
         try:
@@ -834,7 +1103,7 @@ async def market_making_loop(state, client, args):
                         log.info(f"Position is flat. Adjusting strategy bias: FLIP_MODE -> {new_flip_mode}")
                         state.flip_mode = new_flip_mode
                 else:
-                    log.debug(f"Supertrend signal is {'DOWNTREND' if state.supertrend_signal == -1 else 'UPTREND'}, but position is open (${current_notional:.2f}). Holding current strategy bias.")
+                    log.debug("Supertrend signal is %s, but position is open ($%.2f). Holding current strategy bias.", 'DOWNTREND' if state.supertrend_signal == -1 else 'UPTREND', current_notional)
 
             # --- State Synchronization ---
             # Position and balance sync now handled via WebSocket (account_positions and account_info subscriptions)
@@ -843,17 +1112,17 @@ async def market_making_loop(state, client, args):
             # --- Secondary checks for fresh data ---
             if not is_price_data_valid(state):
                 log.info("Waiting for valid price data from WebSocket...")
-                await asyncio.sleep(2)
+                await wait_for_fresh_update(state.price_ready, ORDER_REFRESH_INTERVAL)
                 continue
 
             if not is_balance_data_valid(state):
                 log.info("Waiting for valid balance data from WebSocket...")
-                await asyncio.sleep(2)
+                await wait_for_fresh_update(state.balance_ready, ORDER_REFRESH_INTERVAL)
                 continue
 
             # --- Double-check position before entering opening mode ---
             # DISABLED: Relying on WebSocket updates to avoid Cloudflare 403 errors
-            # The UserDataUpdater handles position updates via WebSocket in real-time
+            # The WebSocket multiplexer handles position updates via WebSocket in real-time
             # if state.mode == opening_mode:
             #     try:
             #         log.debug(f"Double-checking position before placing {opening_mode} order...")
@@ -884,157 +1153,128 @@ async def market_making_loop(state, client, args):
             #         log.warning(f"Failed to double-check position, proceeding with current mode: {e}")
 
             # --- Determine Strategy and Parameters ---
-            buy_spread, sell_spread = get_spreads(state)
+            buy_spread, sell_spread = get_spreads(state, spread_symbol_key)
+            # Read once per tick; nothing awaits before the order parameters are computed
+            mid_price = state.mid_price
+            position_size = state.position_size
+            account_balance = state.account_balance
 
             # SIMPLIFIED MODE: Always use 10% capital, never use reduce_only
             # Alternate between bid and ask based on state.mode
             if state.mode == closing_mode:
                 # Closing mode: Try to close existing position with reduce_only=True
                 # If no position exists, use 10% capital with reduce_only=False to establish position
-                if abs(state.position_size) > 0.001:
+                if abs(position_size) >= dust_quantity:
                     # We have a position - close it
-                    log.info(f"Entering {closing_mode} mode to close position (size: {state.position_size:.8f} BNB).")
+                    log.info(f"Entering {closing_mode} mode to close position (size: {position_size:.8f} BNB).")
                     side = closing_mode
                     reduce_only = True
-                    quantity_to_trade = abs(state.position_size)
+                    quantity_to_trade = abs(position_size)
                     if closing_mode == 'ask':
-                        limit_price = state.mid_price * (1 + sell_spread)
+                        limit_price = mid_price * (1 + sell_spread)
                     else:  # closing_mode == 'bid'
-                        limit_price = state.mid_price * (1 - buy_spread)
-                    log.debug(f"{closing_mode} mode (closing position): side={side}, reduce_only={reduce_only}, quantity_to_trade={quantity_to_trade:.8f}, limit_price={limit_price:.8f}")
+                        limit_price = mid_price * (1 - buy_spread)
+                    log.debug("%s mode (closing position): side=%s, reduce_only=%s, quantity_to_trade=%.8f, limit_price=%.8f", closing_mode, side, reduce_only, quantity_to_trade, limit_price)
                 else:
                     # No position yet - treat like opening mode
                     log.info(f"Entering {closing_mode} mode but no position exists. Using 10% capital to establish position.")
                     side = closing_mode
                     reduce_only = False
-                    order_amount_usd = state.account_balance * DEFAULT_BALANCE_FRACTION
-                    quantity_to_trade = order_amount_usd / state.mid_price
+                    order_amount_usd = account_balance * DEFAULT_BALANCE_FRACTION
+                    quantity_to_trade = order_amount_usd / mid_price
                     if closing_mode == 'ask':
-                        limit_price = state.mid_price * (1 + sell_spread)
+                        limit_price = mid_price * (1 + sell_spread)
                     else:  # closing_mode == 'bid'
-                        limit_price = state.mid_price * (1 - buy_spread)
-                    log.debug(f"{closing_mode} mode (no position): side={side}, reduce_only={reduce_only}, order_amount_usd={order_amount_usd:.2f}, quantity_to_trade={quantity_to_trade:.8f}, limit_price={limit_price:.8f}")
+                        limit_price = mid_price * (1 - buy_spread)
+                    log.debug("%s mode (no position): side=%s, reduce_only=%s, order_amount_usd=%.2f, quantity_to_trade=%.8f, limit_price=%.8f", closing_mode, side, reduce_only, order_amount_usd, quantity_to_trade, limit_price)
             else:  # Opening mode
                 log.info(f"Entering {opening_mode} mode (using {DEFAULT_BALANCE_FRACTION*100:.0f}% capital to open position).")
                 side = opening_mode
                 reduce_only = False
-                order_amount_usd = state.account_balance * DEFAULT_BALANCE_FRACTION
-                quantity_to_trade = order_amount_usd / state.mid_price
+                order_amount_usd = account_balance * DEFAULT_BALANCE_FRACTION
+                quantity_to_trade = order_amount_usd / mid_price
                 if opening_mode == 'bid':
-                    limit_price = state.mid_price * (1 - buy_spread)
+                    limit_price = mid_price * (1 - buy_spread)
                 else:  # opening_mode == 'ask'
-                    limit_price = state.mid_price * (1 + sell_spread)
-                log.debug(f"{opening_mode} mode parameters: side={side}, reduce_only={reduce_only}, order_amount_usd={order_amount_usd:.2f}, quantity_to_trade={quantity_to_trade:.8f}, limit_price={limit_price:.8f}")
+                    limit_price = mid_price * (1 + sell_spread)
+                log.debug("%s mode parameters: side=%s, reduce_only=%s, order_amount_usd=%.2f, quantity_to_trade=%.8f, limit_price=%.8f", opening_mode, side, reduce_only, order_amount_usd, quantity_to_trade, limit_price)
 
             log.info(f"Calculated order parameters: side={side}, quantity={quantity_to_trade:.8f}, price={limit_price:.8f}, reduce_only={reduce_only}")
             current_spread = sell_spread if side == 'ask' else buy_spread
-            log.debug(f"Market data: mid_price={state.mid_price:.8f}, bid={state.bid_price:.8f}, ask={state.ask_price:.8f}, using_spread={current_spread}")
+            log.debug("Market data: mid_price=%.8f, bid=%.8f, ask=%.8f, using_spread=%s", mid_price, state.bid_price, state.ask_price, current_spread)
+
+            # --- Cheap pre-check: skip before rounding/formatting when the order can't reach min notional ---
+            # Rounding can raise the price by at most half a tick and only lowers the quantity, so
+            # this bound never rejects an order the exact post-rounding check below would accept
+            max_notional = (limit_price + tick_size / 2) * quantity_to_trade
+            if max_notional < min_notional:
+                log.warning(f"Order notional too small: ${max_notional:.2f} < ${min_notional:.2f} (min required). Skipping cycle.")
+                await asyncio.sleep(ORDER_REFRESH_INTERVAL)
+                continue
 
             # --- Adjust order to conform to exchange filters ---
-            log.debug(f"Symbol filters: {symbol_filters}")
-            rounded_price = round(limit_price / symbol_filters['tick_size']) * symbol_filters['tick_size']
-            formatted_price = f"{rounded_price:.{symbol_filters['price_precision']}f}"
-            log.debug(f"Price adjustment: {limit_price:.8f} -> {rounded_price:.8f} -> {formatted_price}")
+            log.debug("Symbol filters: %s", symbol_filters)
+            rounded_price = round(limit_price / tick_size) * tick_size
+            formatted_price = price_format(rounded_price)
+            log.debug("Price adjustment: %.8f -> %.8f -> %s", limit_price, rounded_price, formatted_price)
 
-            rounded_quantity = round_down(quantity_to_trade, symbol_filters['quantity_precision'])
-            formatted_quantity = f"{rounded_quantity:.{symbol_filters['quantity_precision']}f}"
+            rounded_quantity = math.floor(quantity_to_trade * quantity_factor) / quantity_factor  # round_down() with a precomputed factor
+            formatted_quantity = quantity_format(rounded_quantity)  # Strings only go to the API; checks below use the rounded floats
             log.info(f"Adjusted order: price={formatted_price}, quantity={formatted_quantity}")
-            log.debug(f"Quantity adjustment: {quantity_to_trade:.8f} -> {rounded_quantity:.8f} -> {formatted_quantity}")
+            log.debug("Quantity adjustment: %.8f -> %.8f -> %s", quantity_to_trade, rounded_quantity, formatted_quantity)
 
-            if float(formatted_quantity) <= 0:
+            if rounded_quantity <= 0:
                 log.warning(f"Calculated quantity is zero or negative: {formatted_quantity}. Skipping cycle.")
                 await asyncio.sleep(ORDER_REFRESH_INTERVAL)
                 continue
 
-            order_notional = float(formatted_price) * float(formatted_quantity)
-            min_notional = symbol_filters['min_notional']
+            order_notional = rounded_price * rounded_quantity
             if order_notional < min_notional:
                 log.warning(f"Order notional too small: ${order_notional:.2f} < ${min_notional:.2f} (min required). Skipping cycle.")
-                log.debug(f"Notional calculation: {formatted_price} * {formatted_quantity} = ${order_notional:.2f}")
+                log.debug("Notional calculation: %s * %s = $%.2f", formatted_price, formatted_quantity, order_notional)
                 await asyncio.sleep(ORDER_REFRESH_INTERVAL)
                 continue
 
-            log.debug(f"Order validation passed: notional=${order_notional:.2f} >= ${min_notional:.2f}")
+            log.debug("Order validation passed: notional=$%.2f >= $%.2f", order_notional, min_notional)
 
             # --- Check if we can reuse existing order ---
-            if should_reuse_order(state, float(formatted_price), side, float(formatted_quantity)):
-                price_change_pct = abs(float(formatted_price) - state.last_order_price) / state.last_order_price * 100
+            if should_reuse_order(state, rounded_price, side, rounded_quantity, tick_size, quantity_factor):
+                price_change_pct = abs(rounded_price - state.last_order_price) / state.last_order_price * 100
                 log.info(f"Reusing existing order {state.active_order_id}: price change {price_change_pct:.4f}% < {DEFAULT_PRICE_CHANGE_THRESHOLD*100:.2f}% threshold")
 
                 # Continue monitoring the existing order
                 filled_qty = 0.0
                 try:
-                    log.debug(f"Continuing to monitor existing order {state.active_order_id} via WebSocket with timeout {ORDER_REFRESH_INTERVAL}s")
-                    start_time = asyncio.get_event_loop().time()
-                    while True:
-                        remaining_timeout = ORDER_REFRESH_INTERVAL - (asyncio.get_event_loop().time() - start_time)
-                        if remaining_timeout <= 0:
-                            raise asyncio.TimeoutError
-
-                        update = await asyncio.wait_for(state.order_updates.get(), timeout=remaining_timeout)
-                        if update.get('type') == 'order_update':
-                            order_data = update.get('order', {})
-                            if order_data.get('order_id') == state.active_order_id:
-                                status = order_data.get('status')
-                                filled_qty = float(order_data.get('filled_amount', 0.0))
-
-                                if status == 'partially_filled':
-                                    avg_price = float(order_data.get('average_price', 0.0))
-                                    if avg_price > 0:
-                                        filled_notional = filled_qty * avg_price
-                                        if filled_notional > POSITION_THRESHOLD_USD:
-                                            log.info(f"Monitored order {state.active_order_id} is partially_filled with notional ${filled_notional:.2f} > ${POSITION_THRESHOLD_USD}. Treating as filled.")
-                                            break # Treat as filled
-
-                                if status in ['filled', 'cancelled', 'rejected', 'expired']:
-                                    log.info(f"Monitored order {state.active_order_id} reached final state {status}. Filled: {filled_qty}")
-                                    break
+                    log.debug("Continuing to monitor existing order %s via WebSocket with timeout %ss", state.active_order_id, ORDER_REFRESH_INTERVAL)
+                    deadline = now() + ORDER_REFRESH_INTERVAL
+                    # One timer for the whole wait: it wakes the slot at the deadline instead of a new timeout per update
+                    deadline_timer = loop.call_at(deadline, order_updates.wake)
+                    try:
+                        while True:
+                            update = await next_order_update(order_updates, deadline, now)
+                            fill = filled_quantity(update, state.active_order_id)
+                            if fill is not None:
+                                filled_qty = fill
+                                log.info(f"Monitored order {state.active_order_id} reached FILLED state. Filled: {filled_qty}")
+                                break
+                    finally:
+                        deadline_timer.cancel()
 
                     log.info(f"Reused order {state.active_order_id} filled! Quantity: {filled_qty}")
 
                     # Update state after a fill (same logic as new order)
-                    previous_mode = state.mode
-                    previous_position = state.position_size
-
-                    if state.mode == opening_mode:  # An opening order was filled
-                        if opening_mode == 'bid':
-                            state.position_size += filled_qty
-                        else:  # opening_mode == 'ask'
-                            state.position_size -= filled_qty
-                        log.info(f"{opening_mode} fill processed: new position size {state.position_size:.6f}")
-                        state.mode = closing_mode  # Flip to closing mode
-                        log.info(f"Mode change: {previous_mode} -> {state.mode}")
-                    else:  # A closing order was filled
-                        if closing_mode == 'ask':
-                            state.position_size -= filled_qty
-                        else:  # closing_mode == 'bid'
-                            state.position_size += filled_qty
-                        log.info(f"{closing_mode} fill processed: new position size {state.position_size:.6f}")
-
-                        # Check if position is mostly closed
-                        position_threshold_coins = POSITION_THRESHOLD_USD / state.mid_price
-                        if abs(state.position_size) < position_threshold_coins:
-                            state.mode = opening_mode  # Flip back to opening mode
-                            log.info(f"Position below threshold ({position_threshold_coins:.6f}), mode change: {previous_mode} -> {state.mode}")
-                        else:
-                            log.info(f"Position still above threshold, keeping {closing_mode} mode.")
-
-                    # Clear order tracking after fill
-                    state.last_order_price = None
-                    state.last_order_side = None
-                    state.last_order_quantity = None
-                    log.debug("Adding 0.1s delay after order fill to avoid API rate limits")
-                    await asyncio.sleep(0.01)
+                    apply_fill(filled_qty)
+                    await rate_limiter.acquire()  # Paces the next cycle's requests only when near the API limit
 
                 except asyncio.TimeoutError:
                     log.info(f"Reused order {state.active_order_id} not filled within {ORDER_REFRESH_INTERVAL}s. Will evaluate for replacement in next cycle.")
-                    await asyncio.sleep(0.01)
+                    await rate_limiter.acquire()
 
                 continue  # Skip to next iteration
 
             # --- Rate Limiting Protection ---
             global last_order_time
-            current_time = asyncio.get_event_loop().time()
+            current_time = now()
             time_since_last_order = current_time - last_order_time
 
             if time_since_last_order < MIN_ORDER_INTERVAL:
@@ -1057,7 +1297,7 @@ async def market_making_loop(state, client, args):
             # --- Safety check for reduce-only orders ---
             if reduce_only:
                 # Verify position exists before placing reduce-only order
-                if abs(state.position_size) < 1e-9:
+                if abs(state.position_size) < dust_quantity:
                     log.warning(f"Cannot place reduce-only order: position_size is {state.position_size:.6f} (effectively zero)")
                     log.info(f"Resetting to opening mode: {opening_mode}")
                     state.mode = opening_mode
@@ -1066,13 +1306,13 @@ async def market_making_loop(state, client, args):
                     continue
 
             # --- Place and Monitor Order ---
-            percentage_diff = (float(formatted_price) - state.mid_price) / state.mid_price * 100
+            percentage_diff = (rounded_price - state.mid_price) / state.mid_price * 100
             log.info(f"Placing {side} order: {formatted_quantity} {args.symbol} @ {formatted_price} ({percentage_diff:+.4f}% from mid-price)")
             log.info(f"Order details: symbol={args.symbol}, price={formatted_price}, quantity={formatted_quantity}, side={side}, reduceOnly={reduce_only}")
 
             try:
                 active_order = await client.place_order(args.symbol, formatted_price, formatted_quantity, side, reduce_only)
-                last_order_time = asyncio.get_event_loop().time()
+                last_order_time = now()
                 # Extract order_id from Pacifica API response format: {"success": true, "data": {"order_id": 123}}
                 if active_order.get('success') and 'data' in active_order:
                     state.active_order_id = active_order['data'].get('order_id')
@@ -1080,12 +1320,13 @@ async def market_making_loop(state, client, args):
                     state.active_order_id = active_order.get('order_id')  # Fallback for other formats
 
                 # Track order details for reuse logic
-                state.last_order_price = float(formatted_price)
+                state.last_order_price = rounded_price
                 state.last_order_side = side
-                state.last_order_quantity = float(formatted_quantity)
+                state.last_order_quantity = rounded_quantity
 
                 log.info(f"Order placed successfully: ID={state.active_order_id}")
-                log.debug(f"Full order response: {active_order}")
+                state.consecutive_errors = 0
+                log.debug("Full order response: %s", active_order)
             except Exception as order_error:
                 log.error(f"Failed to place order: {order_error}")
                 log.error(f"Order parameters: symbol={args.symbol}, price={formatted_price}, quantity={formatted_quantity}, side={side}, reduceOnly={reduce_only}")
@@ -1095,73 +1336,46 @@ async def market_making_loop(state, client, args):
             # Wait for order updates from WebSocket subscription (account_orders channel)
             filled_qty = 0.0
             try:
-                log.debug(f"Waiting for WebSocket update for order {state.active_order_id} with timeout {ORDER_REFRESH_INTERVAL}s")
-                start_time = asyncio.get_event_loop().time()
-                while True:
-                    remaining_timeout = ORDER_REFRESH_INTERVAL - (asyncio.get_event_loop().time() - start_time)
-                    if remaining_timeout <= 0:
-                        raise asyncio.TimeoutError
-
-                    update = await asyncio.wait_for(state.order_updates.get(), timeout=remaining_timeout)
-                    if update.get('e') == 'ORDER_FILLED':
-                        order_data = update.get('o', {})
-                        if order_data.get('i') == state.active_order_id:
-                            status = order_data.get('X')
-                            filled_qty = float(order_data.get('z', 0.0))
-
-                            # Note: Pacifica doesn't support PARTIALLY_FILLED status like ASTER
-                            # All fills come through as FILLED status
-                            if status == 'FILLED':
-                                log.info(f"Order {state.active_order_id} reached FILLED state. Filled: {filled_qty}")
-                                break
+                log.debug("Waiting for WebSocket update for order %s with timeout %ss", state.active_order_id, ORDER_REFRESH_INTERVAL)
+                deadline = now() + ORDER_REFRESH_INTERVAL
+                # One timer for the whole wait: it wakes the slot at the deadline instead of a new timeout per update
+                deadline_timer = loop.call_at(deadline, order_updates.wake)
+                try:
+                    while True:
+                        update = await next_order_update(order_updates, deadline, now)
+                        fill = filled_quantity(update, state.active_order_id)
+                        if fill is not None:
+                            filled_qty = fill
+                            log.info(f"Order {state.active_order_id} reached FILLED state. Filled: {filled_qty}")
+                            break
+                finally:
+                    deadline_timer.cancel()
 
                 log.info(f"Order {state.active_order_id} filled! Quantity: {filled_qty}")
 
                 # Update state after a fill
-                previous_mode = state.mode
-                previous_position = state.position_size
-
-                if state.mode == opening_mode:  # An opening order was filled
-                    if opening_mode == 'bid':
-                        state.position_size += filled_qty
-                    else:  # opening_mode == 'ask'
-                        state.position_size -= filled_qty
-                    log.info(f"{opening_mode} fill processed: new position size {state.position_size:.6f}")
-                    state.mode = closing_mode  # Flip to closing mode
-                    log.info(f"Mode change: {previous_mode} -> {state.mode}")
-                else:  # A closing order was filled
-                    if closing_mode == 'ask':
-                        state.position_size -= filled_qty
-                    else:  # closing_mode == 'bid'
-                        state.position_size += filled_qty
-                    log.info(f"{closing_mode} fill processed: new position size {state.position_size:.6f}")
-
-                    # Check if position is mostly closed
-                    position_threshold_coins = POSITION_THRESHOLD_USD / state.mid_price if state.mid_price else 0
-                    if abs(state.position_size) < position_threshold_coins:
-                        state.mode = opening_mode  # Flip back to opening mode
-                        log.info(f"Position below threshold ({position_threshold_coins:.6f}), mode change: {previous_mode} -> {state.mode}")
-                    else:
-                        log.info(f"Position still above threshold, keeping {closing_mode} mode.")
+                apply_fill(filled_qty)
 
-                # Clear order tracking after fill
-                state.last_order_price = None
-                state.last_order_side = None
-                state.last_order_quantity = None
-
-                # Add a small delay to avoid hammering the API after fills
-                log.debug("Adding 0.01s delay after order fill to avoid API rate limits")
-                await asyncio.sleep(0.01)
+                # Avoid hammering the API after fills; only waits when the token bucket is empty
+                await rate_limiter.acquire()
 
             except asyncio.TimeoutError:
                 log.info(f"Order {state.active_order_id} not filled within {ORDER_REFRESH_INTERVAL}s. Cancelling and refreshing.")
                 try:
                     if CANCEL_SPECIFIC_ORDER and state.active_order_id:
-                        cancel_result = await client.cancel_order(args.symbol, state.active_order_id)
-                        log.debug(f"Cancel order result: {cancel_result}")
+                        cancel_result = None
+                        if state.ws_send is not None:
+                            # One frame on the open WebSocket instead of a REST round-trip
+                            try:
+                                cancel_result = await client.cancel_order_ws(state.ws_send, args.symbol, state.active_order_id)
+                            except Exception as ws_cancel_error:
+                                log.warning(f"WebSocket cancel failed ({ws_cancel_error}). Falling back to REST.")
+                        if cancel_result is None:
+                            cancel_result = await client.cancel_order(args.symbol, state.active_order_id)
+                        log.debug("Cancel order result: %s", cancel_result)
                     else:
                         cancel_result = await client.cancel_all_orders(args.symbol)
-                        log.debug(f"Cancel all orders result: {cancel_result}")
+                        log.debug("Cancel all orders result: %s", cancel_result)
                 except Exception as cancel_error:
                     log.warning(f"Error cancelling orders: {cancel_error}")
 
@@ -1171,21 +1385,21 @@ async def market_making_loop(state, client, args):
                 state.last_order_side = None
                 state.last_order_quantity = None
 
-                log.debug("Adding 0.1s delay after order timeout to avoid API rate limits")
-                await asyncio.sleep(0.01)
+                await rate_limiter.acquire()
 
         except asyncio.TimeoutError:
             log.warning("Timeout in main loop. Continuing...")
-            await asyncio.sleep(0.01)
+            await rate_limiter.acquire()
         except Exception as e:
             log.error(f"An error occurred in the main loop: {e}", exc_info=True)
-            log.error(f"Current state: mode={state.mode}, position_size={state.position_size}, active_order_id={state.active_order_id}")
-            log.error(f"Market data: mid_price={state.mid_price}, bid={state.bid_price}, ask={state.ask_price}")
+            log.error("Current state: mode=%s, position_size=%s, active_order_id=%s", state.mode, state.position_size, state.active_order_id)
+            log.error("Market data: mid_price=%s, bid=%s, ask=%s", state.mid_price, state.bid_price, state.ask_price)
 
             # Check if this is a reduce-only order error (position desync)
-            error_msg = str(e)
             # Detect 422 errors on reduce-only orders - indicates position doesn't exist
-            if ("422" in error_msg and state.mode == closing_mode) or "No position found" in error_msg:
+            if isinstance(e, PacificaHTTPError) and (
+                (e.status == 422 and state.mode == closing_mode) or "No position found" in e.message
+            ):
                 log.warning(f"Reduce-only order failed with 422 error. Position desync detected. Resetting state.")
                 state.position_size = 0.0
                 state.mode = opening_mode
@@ -1194,7 +1408,9 @@ async def market_making_loop(state, client, args):
                 state.last_order_side = None
                 state.last_order_quantity = None
                 log.info(f"State reset: position_size=0, mode={opening_mode}")
-                await asyncio.sleep(2)
+                retry_delay = error_backoff_delay(REDUCE_ONLY_RECOVERY_DELAY, state.consecutive_errors)
+                state.consecutive_errors += 1
+                await asyncio.sleep(retry_delay)
                 continue
 
             # Try to cancel any outstanding orders
@@ -1213,59 +1429,117 @@ async def market_making_loop(state, client, args):
                 except Exception as cleanup_error:
                     log.error(f"Failed to cancel orders during error cleanup: {cleanup_error}")
 
-            log.info(f"Waiting for {RETRY_ON_ERROR_INTERVAL} seconds before retrying...")
-            await asyncio.sleep(RETRY_ON_ERROR_INTERVAL)
+            retry_delay = error_backoff_delay(RETRY_ON_ERROR_INTERVAL, state.consecutive_errors)
+            state.consecutive_errors += 1
+            log.info(f"Waiting for {retry_delay:.1f} seconds before retrying (consecutive errors: {state.consecutive_errors})...")
+            await asyncio.sleep(retry_delay)
 
 
 
 async def fetch_initial_balance(state, client):
-    """Fetch initial account balance via REST API."""
+    """Fetch initial account balance via REST API, retrying transient errors within INITIAL_BALANCE_TIMEOUT."""
     log = logging.getLogger('InitialBalance')
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + INITIAL_BALANCE_TIMEOUT
+    retry_delay = 0.1
 
-    try:
-        log.info("Fetching initial account balance...")
-        account_info = await client.get_account_info()
+    while True:
+        try:
+            log.info("Fetching initial account balance...")
+            account_info = await asyncio.wait_for(client.get_account_info(), timeout=max(deadline - loop.time(), 0))
 
-        # Pacifica API format: {"success": true, "data": {"balance": "121.08", "available_to_spend": "121.08"}}
-        data = account_info.get('data', {})
+            # Pacifica API format: {"success": true, "data": {"balance": "121.08", "available_to_spend": "121.08"}}
+            data = account_info.get('data', {})
 
-        # Use available_to_spend as the available balance
-        balance = float(data.get('available_to_spend', 0))
-        state.usdc_balance = balance
-        state.account_balance = balance
-        state.balance_last_updated = asyncio.get_event_loop().time()
+            # Use available_to_spend as the available balance
+            balance = float(data.get('available_to_spend', 0))
+            state.usdc_balance = balance
+            state.account_balance = balance
+            state.balance_last_updated = time.monotonic()
+            state.balance_changed.set()
+            state.balance_ready.set()
 
-        log.info(f"Initial balance loaded: USDC={state.usdc_balance:.4f}, Total=${state.account_balance:.4f}")
+            log.info(f"Initial balance loaded: USDC={state.usdc_balance:.4f}, Total=${state.account_balance:.4f}")
+            return True
+
+        except Exception as e:
+            # Permanent failures (bad key or account, malformed response, ...) won't fix themselves
+            if not is_transient_http_error(e):
+                log.error(f"Failed to fetch initial balance: {e}", exc_info=True)
+                return False
+
+            # Transient failure: retry with a jittered, doubling delay until the budget runs out
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                log.error(f"Failed to fetch initial balance within {INITIAL_BALANCE_TIMEOUT}s: {e!r}")
+                return False
+            delay = min(retry_delay + random.uniform(0, retry_delay), remaining)
+            log.warning(f"Initial balance fetch failed ({e!r}). Retrying in {delay:.2f}s...")
+            await asyncio.sleep(delay)
+            retry_delay = min(retry_delay * 2, INITIAL_BALANCE_MAX_RETRY_DELAY)
+
+
+async def fetch_initial_position(state, client, symbol):
+    """Fetch an existing position via REST API and start in closing mode if there is one to close."""
+    log = logging.getLogger('InitialPosition')
+
+    try:
+        log.info(f"Checking for existing position for {symbol}...")
+        positions = await client.get_position_risk(symbol)
+        log.debug("Position risk response: %s", positions)
+
+        if positions and 'positions' in positions:
+            for position in positions['positions']:
+                if position.get('symbol') == symbol:
+                    position_size = float(position.get('size', 0.0))
+                    entry_price = float(position.get('entry_price', 0.0))
+                    notional_value = abs(position_size * entry_price)
+
+                    position_is_long = position_size > 0
+                    position_is_short = position_size < 0
+
+                    # If in normal mode, look for a LONG position to close.
+                    if not state.flip_mode and position_is_long and notional_value > POSITION_THRESHOLD_USD:
+                        log.info(f"Found existing LONG position of size {position_size} with notional value ${notional_value:.2f}.")
+                        state.position_size = position_size
+                        state.mode = 'ask'  # Set to closing mode
+                    # If in flip mode, look for a SHORT position to close.
+                    elif state.flip_mode and position_is_short and notional_value > POSITION_THRESHOLD_USD:
+                        log.info(f"Found existing SHORT position of size {position_size} with notional value ${notional_value:.2f}.")
+                        state.position_size = position_size
+                        state.mode = 'bid'  # Set to closing mode
+                    break
         return True
 
     except Exception as e:
-        log.error(f"Failed to fetch initial balance: {e}", exc_info=True)
+        log.warning(f"Could not check for existing position, starting in default {state.mode} mode: {e}", exc_info=True)
         return False
 
 
-async def cleanup_orders(symbol, private_key):
-    """Cleanup function to cancel all orders"""
+async def cleanup_orders(symbol, client):
+    """Cleanup function to cancel all orders, using the already open client"""
     try:
         logging.info(f"Performing final cleanup: Cancelling all orders for {symbol}.")
-        async with ApiClient(private_key, RELEASE_MODE) as cleanup_client:
-            await cleanup_client.cancel_all_orders(symbol)
+        await client.cancel_all_orders(symbol)
         logging.info("All open orders cancelled. Shutdown complete.")
     except Exception as e:
         logging.error(f"Error during final order cancellation: {e}")
 
 # Global variables for signal handling
 shutdown_requested = False
+shutdown_event = None  # Created in main(); main() sleeps on it instead of polling shutdown_requested
 global_args = None
-global_private_key = None
 
-def signal_handler(signum, frame):
+def signal_handler(signum, frame=None):
     """Handle SIGTERM and SIGINT signals"""
     global shutdown_requested
     logging.info(f"Signal {signum} received, initiating shutdown...")
     shutdown_requested = True
+    if shutdown_event is not None:
+        shutdown_event.set()
 
 async def main():
-    global global_args, global_private_key
+    global global_args, shutdown_event
 
     parser = argparse.ArgumentParser(description="A market making bot for Pacifica Finance.")
     parser.add_argument("--symbol", type=str, default=DEFAULT_SYMBOL, help="The symbol to trade.")
@@ -1278,15 +1552,20 @@ async def main():
 
     load_dotenv()
     PRIVATE_KEY = os.getenv("PRIVATE_KEY")
-    global_private_key = PRIVATE_KEY
 
     if not PRIVATE_KEY:
         logging.error("PRIVATE_KEY not found in environment variables")
         return
 
     # Set up signal handlers
-    signal.signal(signal.SIGTERM, signal_handler)
-    signal.signal(signal.SIGINT, signal_handler)
+    shutdown_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, signal_handler, sig)
+        except NotImplementedError:
+            # Windows event loops have no add_signal_handler
+            signal.signal(sig, signal_handler)
 
     client = None
     tasks = []
@@ -1297,59 +1576,48 @@ async def main():
 
         async with client:
             try:
-                logging.info(f"Sending initial cancel all orders for {args.symbol} to ensure a clean slate.")
-                await client.cancel_all_orders(args.symbol)
-            except Exception as e:
-                logging.warning(f"Failed to send initial cancel all orders, proceeding anyway: {e}")
+                # Initialize Supertrend signal before checking positions or starting loops
+                # (flip_mode decides whether a snapshot position is one to close)
+                if USE_SUPERTREND_SIGNAL:
+                    await initialize_supertrend_signal(state, args.symbol)
 
-            # Fetch initial account balance with a timeout
-            logging.info("Fetching initial account balance...")
-            try:
-                balance_success = await asyncio.wait_for(fetch_initial_balance(state, client), timeout=20.0)
-                if not balance_success:
-                    logging.error("Failed to fetch initial balance. Cannot proceed.")
-                    return
-            except asyncio.TimeoutError:
-                logging.error("Timed out while fetching initial balance. Cannot proceed.")
-                return
-
-            # Initialize Supertrend signal before checking positions or starting loops
-            if USE_SUPERTREND_SIGNAL:
-                await initialize_supertrend_signal(state, args.symbol)
+                # Open the WebSocket first: its account_info/account_positions snapshot replaces the
+                # REST balance and position calls on the startup path
+                tasks.append(asyncio.create_task(websocket_multiplexer(state, client, args.symbol)))
 
-            try:
-                logging.info(f"Checking for existing position for {args.symbol}...")
-                positions = await client.get_position_risk(args.symbol)
-                logging.debug(f"Position risk response: {positions}")
-
-                position_found = False
-                if positions and 'positions' in positions:
-                    for position in positions['positions']:
-                        if position.get('symbol') == args.symbol:
-                            position_size = float(position.get('size', 0.0))
-                            entry_price = float(position.get('entry_price', 0.0))
-                            notional_value = abs(position_size * entry_price)
-
-                            position_is_long = position_size > 0
-                            position_is_short = position_size < 0
-
-                            # If in normal mode, look for a LONG position to close.
-                            if not state.flip_mode and position_is_long and notional_value > 15.0:
-                                logging.info(f"Found existing LONG position of size {position_size} with notional value ${notional_value:.2f}.")
-                                state.position_size = position_size
-                                state.mode = 'ask'  # Set to closing mode
-                                logging.info(f"Starting in ask mode to close position.")
-                                position_found = True
-                            # If in flip mode, look for a SHORT position to close.
-                            elif state.flip_mode and position_is_short and notional_value > 15.0:
-                                logging.info(f"Found existing SHORT position of size {position_size} with notional value ${notional_value:.2f}.")
-                                state.position_size = position_size
-                                state.mode = 'bid'  # Set to closing mode
-                                logging.info(f"Starting in bid mode to close position.")
-                                position_found = True
-                            break
+                # The initial cancel-all and the snapshot are independent: wait for both at once
+                # so startup costs the slower of the two rather than their sum
+                logging.info(f"Sending initial cancel all orders for {args.symbol} to ensure a clean slate.")
+                logging.info("Waiting for the account snapshot from WebSocket...")
+                cancel_result, snapshot_result = await asyncio.gather(
+                    client.cancel_all_orders(args.symbol),
+                    asyncio.wait_for(
+                        asyncio.gather(state.balance_ready.wait(), state.positions_ready.wait()),
+                        timeout=INITIAL_SNAPSHOT_TIMEOUT,
+                    ),
+                    return_exceptions=True,
+                )
+                if isinstance(cancel_result, Exception):
+                    logging.warning(f"Failed to send initial cancel all orders, proceeding anyway: {cancel_result}")
+
+                if isinstance(snapshot_result, asyncio.TimeoutError):
+                    logging.warning(f"No WebSocket account snapshot within {INITIAL_SNAPSHOT_TIMEOUT}s. Falling back to REST.")
+                    # Whatever is still missing is fetched concurrently as well
+                    balance_fetch = None
+                    if not state.balance_ready.is_set():
+                        balance_fetch = asyncio.create_task(fetch_initial_balance(state, client))
+                    if not state.positions_ready.is_set():
+                        await fetch_initial_position(state, client, args.symbol)
+                    if balance_fetch is not None and not await balance_fetch:
+                        logging.error("Failed to fetch initial balance. Cannot proceed.")
+                        return
+                elif isinstance(snapshot_result, BaseException):
+                    raise snapshot_result
+                else:
+                    logging.info(f"Account snapshot received: balance=${state.account_balance:.4f}, position={state.position_size:.6f}")
 
-                if not position_found:
+                opening_mode = 'ask' if state.flip_mode else 'bid'
+                if state.mode == opening_mode:
                     logging.info("No significant existing position found.")
                     try:
                         logging.info(f"Attempting to set leverage for {args.symbol} to {DEFAULT_LEVERAGE}x.")
@@ -1357,47 +1625,48 @@ async def main():
                         logging.info(f"Successfully set leverage for {args.symbol} to {DEFAULT_LEVERAGE}x.")
                     except Exception as e:
                         logging.error(f"Failed to set leverage: {e}", exc_info=True)
-
-                    opening_mode = 'ask' if state.flip_mode else 'bid'
                     logging.info(f"Starting in default {opening_mode} mode.")
-
-            except Exception as e:
-                logging.warning(f"Could not check for existing position or set leverage, starting in default {state.mode} mode: {e}", exc_info=True)
-
-            # Start all async tasks
-            mm_task = asyncio.create_task(market_making_loop(state, client, args))
-            tasks = [
-                asyncio.create_task(websocket_price_updater(state, args.symbol)),
-                asyncio.create_task(websocket_user_data_updater(state, client, args.symbol)),  # RE-ENABLED with updated subscriptions
-                asyncio.create_task(balance_reporter(state)),
-                mm_task,
-                asyncio.create_task(price_reporter(state, args.symbol)),
-            ]
-            if USE_SUPERTREND_SIGNAL:
-                tasks.append(asyncio.create_task(supertrend_signal_updater(state, args.symbol)))
-
-            # Wait for either the market making task to complete or shutdown signal
-            while not shutdown_requested and not mm_task.done():
-                await asyncio.sleep(0.01)
+                else:
+                    logging.info(f"Starting in {state.mode} mode to close position.")
+
+                # Start all async tasks
+                rate_limiter = AsyncTokenBucket(rate=API_RATE_LIMIT_PER_SEC, capacity=API_RATE_LIMIT_BURST)
+                mm_task = asyncio.create_task(market_making_loop(state, client, args, rate_limiter))
+                tasks += [
+                    asyncio.create_task(balance_reporter(state)),
+                    mm_task,
+                    asyncio.create_task(price_reporter(state, args.symbol)),
+                ]
+                if USE_AVELLANEDA_SPREADS:
+                    tasks.append(asyncio.create_task(spread_refresher(args.symbol)))
+
+                # Wait for either the market making task to complete or shutdown signal
+                shutdown_wait = asyncio.create_task(shutdown_event.wait())
+                tasks.append(shutdown_wait)
+                await asyncio.wait({mm_task, shutdown_wait}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                logging.info("Shutdown initiated. Cleaning up...")
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+
+                if tasks:
+                    await asyncio.gather(*tasks, return_exceptions=True)
+
+                # Always perform cleanup, on the main client while its session is still open
+                await cleanup_orders(args.symbol, client)
 
     except asyncio.CancelledError:
         logging.info("Main task was cancelled.")
     except Exception as e:
         logging.error(f"An unhandled exception occurred in main: {e}", exc_info=True)
-    finally:
-        logging.info("Shutdown initiated. Cleaning up...")
-        for task in tasks:
-            if not task.done():
-                task.cancel()
-
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Always perform cleanup
-        await cleanup_orders(args.symbol, PRIVATE_KEY)
 
 
 if __name__ == "__main__":
+    if UVLOOP_AVAILABLE:
+        # Faster socket and queue scheduling for the WebSocket updaters and the fill-event queue
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Test that ApiClient.batch_cancel signs every Cancel action with the same timestamp
+(/orders/batch rejects a batch whose actions carry different timestamps)
+No network access: batch_orders is replaced to capture the actions
+"""
+import asyncio
+import time
+from solders.keypair import Keypair
+
+from api_client import ApiClient
+
+
+def test_batch_cancel_uses_one_timestamp():
+    client = ApiClient(str(Keypair()), release_mode=True)
+    captured = {}
+
+    async def capture_batch_orders(actions):
+        captured["actions"] = actions
+        return {"success": True}
+
+    client.batch_orders = capture_batch_orders
+
+    # Make every clock read return a new millisecond, so per-action timestamps would differ
+    real_time = time.time
+    ticks = iter(range(10_000))
+    time.time = lambda: real_time() + next(ticks) / 1_000
+    try:
+        asyncio.run(client.batch_cancel("BTC", [101, 102, 103]))
+    finally:
+        time.time = real_time
+
+    actions = captured["actions"]
+    assert [action["data"]["order_id"] for action in actions] == [101, 102, 103]
+    assert all(action["type"] == "Cancel" for action in actions)
+    assert len({action["data"]["timestamp"] for action in actions}) == 1
+
+
+if __name__ == "__main__":
+    test_batch_cancel_uses_one_timestamp()
+    print("batch_cancel timestamp test passed")